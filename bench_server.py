@@ -0,0 +1,88 @@
+# Test de charge du serveur MCP distant (servers/research_server_L9.py)
+# bench_server.py
+#
+# Usage: python bench_server.py
+# La recherche arXiv est simulée (aucun accès réseau) : elle bloque son thread
+# pendant SLOW_SEARCH_SECONDS, comme le ferait une requête arXiv lente.
+# On mesure la latence de extract_info au repos, puis pendant cette recherche :
+# avec des tools async, elle doit rester du même ordre de grandeur.
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SLOW_SEARCH_SECONDS = 5.0
+SAMPLES = 50
+PAPER_ID = "0000.00001v1"
+
+
+def _fake_paper(i: int) -> dict:
+    return {
+        "title": f"Paper {i}",
+        "authors": [f"Author {i}"],
+        "summary": "Lorem ipsum dolor sit amet. " * 20,
+        "pdf_url": f"http://arxiv.org/pdf/{i:04d}.00000v1",
+        "published": "2024-01-01",
+    }
+
+
+def _slow_search_arxiv(topic: str, max_results: int, *args, **kwargs) -> dict:
+    time.sleep(SLOW_SEARCH_SECONDS)
+    return {f"slow.{i:05d}v1": _fake_paper(i) for i in range(max_results)}
+
+
+async def _extract_latencies(server, duration: float) -> list:
+    latencies = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        await server.mcp.call_tool("extract_info", {"paper_id": PAPER_ID})
+        latencies.append((time.perf_counter() - start) * 1e3)
+        await asyncio.sleep(duration / SAMPLES)
+    return latencies
+
+
+def _row(label: str, latencies: list) -> str:
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    return f"{label:>22} {statistics.median(latencies):>10.2f} {p95:>10.2f} {max(latencies):>10.2f}"
+
+
+async def main():
+    # Serveur isolé dans un dossier temporaire, sans cache de requêtes
+    os.chdir(tempfile.mkdtemp())
+    os.environ["ARXIV_CACHE_TTL"] = "0"
+    sys.path.insert(0, os.path.join(ROOT, "servers"))
+    import research_server_L9 as server
+    import research_tools
+
+    # Les tools partagés appellent arXiv depuis research_tools.py
+    research_tools.search_arxiv = _slow_search_arxiv
+    server.store.add_papers("seed", {PAPER_ID: _fake_paper(1)})
+
+    idle = await _extract_latencies(server, duration=1.0)
+
+    search = asyncio.create_task(
+        server.mcp.call_tool("search_papers", {"topic": "slow topic", "max_results": 5})
+    )
+    await asyncio.sleep(0.1)
+    busy = await _extract_latencies(server, duration=SLOW_SEARCH_SECONDS / 2)
+    overlapped = not search.done()
+    await search
+
+    print(f"→ extract_info pendant une recherche de {SLOW_SEARCH_SECONDS:.0f} s")
+    print(f"{'':>22} {'p50 (ms)':>10} {'p95 (ms)':>10} {'max (ms)':>10}")
+    print(_row("au repos", idle))
+    print(_row("recherche en cours", busy))
+
+    if not overlapped:
+        print("\nKO: la recherche s'est terminée avant la fin des mesures.")
+    elif max(busy) < SLOW_SEARCH_SECONDS * 1e3 / 10:
+        print("\nOK: les lectures ne sont pas bloquées par la recherche.")
+    else:
+        print("\nKO: extract_info a attendu la fin de la recherche.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,259 @@
+# Benchmark du stockage des papiers (servers/paper_store.py)
+# bench_store.py
+#
+# Usage: python bench_store.py
+# Tout est écrit dans un dossier temporaire, aucun accès réseau.
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "servers"))
+
+from paper_store import JsonPaperStore, SqlitePaperStore
+
+PAPERS_PER_TOPIC = 5
+LOOKUPS = 200
+
+
+def _fake_paper(i: int) -> dict:
+    return {
+        "title": f"Paper {i}",
+        "authors": [f"Author {i}"],
+        "summary": "Lorem ipsum dolor sit amet. " * 20,
+        "pdf_url": f"http://arxiv.org/pdf/{i:04d}.00000v1",
+        "published": "2024-01-01",
+    }
+
+
+def _populate(paper_dir: str, n_topics: int) -> list:
+    """Crée n_topics dossiers papers_info.json, comme le faisait search_papers."""
+    ids = []
+    for t in range(n_topics):
+        topic_dir = os.path.join(paper_dir, f"topic_{t}")
+        os.makedirs(topic_dir)
+        papers = {}
+        for p in range(PAPERS_PER_TOPIC):
+            paper_id = f"{t:05d}.{p:05d}v1"
+            papers[paper_id] = _fake_paper(t * PAPERS_PER_TOPIC + p)
+            ids.append(paper_id)
+        with open(os.path.join(topic_dir, "papers_info.json"), "w") as f:
+            json.dump(papers, f, indent=2)
+    return ids
+
+
+def _scan_lookup(paper_dir: str, paper_id: str):
+    """Ancienne implémentation de extract_info : on relit chaque topic."""
+    for item in os.listdir(paper_dir):
+        file_path = os.path.join(paper_dir, item, "papers_info.json")
+        if os.path.isfile(file_path):
+            with open(file_path, "r") as json_file:
+                papers_info = json.load(json_file)
+                if paper_id in papers_info:
+                    return papers_info[paper_id]
+    return None
+
+
+def _per_lookup_us(fn, ids) -> float:
+    sample = random.sample(ids, min(LOOKUPS, len(ids)))
+    start = time.perf_counter()
+    for paper_id in sample:
+        assert fn(paper_id) is not None
+    return (time.perf_counter() - start) / len(sample) * 1e6
+
+
+def bench_extract_info():
+    print("→ extract_info : scan complet vs index paper_id → (fichier, offset)")
+    print(f"{'topics':>8} {'scan (µs)':>12} {'index (µs)':>12} {'startup (ms)':>14}")
+    for n_topics in (10, 100, 1000):
+        with tempfile.TemporaryDirectory() as paper_dir:
+            ids = _populate(paper_dir, n_topics)
+
+            scan = _per_lookup_us(lambda pid: _scan_lookup(paper_dir, pid), ids)
+
+            start = time.perf_counter()
+            store = JsonPaperStore(paper_dir)
+            startup = (time.perf_counter() - start) * 1e3
+            indexed = _per_lookup_us(store.get_paper, ids)
+
+            print(f"{n_topics:>8} {scan:>12.1f} {indexed:>12.1f} {startup:>14.1f}")
+
+
+def _rewrite_add(paper_dir: str, papers: dict) -> None:
+    """Ancienne écriture de search_papers : relire, fusionner, tout réécrire."""
+    file_path = os.path.join(paper_dir, "big", "papers_info.json")
+    try:
+        with open(file_path, "r") as json_file:
+            papers_info = json.load(json_file)
+    except FileNotFoundError:
+        papers_info = {}
+    papers_info.update(papers)
+    with open(file_path, "w") as json_file:
+        json.dump(papers_info, json_file, indent=2)
+
+
+def bench_add_papers():
+    print("\n→ search_papers (écriture de 5 papiers) : réécriture complète vs segment append-only")
+    print(f"{'papiers':>8} {'rewrite (ms)':>14} {'append (ms)':>13}")
+    for size in (100, 1000, 10000):
+        with tempfile.TemporaryDirectory() as paper_dir:
+            existing = {f"old.{i:05d}": _fake_paper(i) for i in range(size)}
+            os.makedirs(os.path.join(paper_dir, "big"))
+            _rewrite_add(paper_dir, existing)
+            store = JsonPaperStore(paper_dir, compact_bytes=1 << 40)
+
+            new = [{f"new.{b}.{i}": _fake_paper(i) for i in range(PAPERS_PER_TOPIC)} for b in range(20)]
+            start = time.perf_counter()
+            for batch in new:
+                _rewrite_add(paper_dir, batch)
+            rewrite = (time.perf_counter() - start) / len(new) * 1e3
+
+            start = time.perf_counter()
+            for batch in new:
+                store.add_papers("big", batch)
+            append = (time.perf_counter() - start) / len(new) * 1e3
+
+            print(f"{size:>8} {rewrite:>14.2f} {append:>13.2f}")
+
+
+def check_concurrent_writers(writers: int = 4, calls: int = 30):
+    """Des écritures concurrentes déclenchent des compactions en boucle : aucun papier ne doit se perdre."""
+    print("\n→ add_papers concurrents avec compaction (JSON) : vérification")
+    with tempfile.TemporaryDirectory() as paper_dir:
+        store = JsonPaperStore(paper_dir, compact_bytes=2000)
+
+        def write(w: int) -> None:
+            for c in range(calls):
+                store.add_papers("busy", {
+                    f"{w:02d}{c:03d}.{p:05d}v1": _fake_paper(p) for p in range(PAPERS_PER_TOPIC)
+                })
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.close()
+        store.compact("busy")
+
+        expected = writers * calls * PAPERS_PER_TOPIC
+        found = len(JsonPaperStore(paper_dir).get_topic_papers("busy") or {})
+        print(f"{writers} écrivains x {calls} appels : {found}/{expected} papiers")
+        assert found == expected, f"{expected - found} papiers perdus"
+
+
+def _synthetic_corpus(n_papers: int, vocabulary: int = 20000, words: int = 150) -> dict:
+    """Résumés aléatoires dont les mots suivent une loi de Zipf, comme du vrai texte."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    ranks = np.minimum(rng.zipf(1.2, size=(n_papers, words)), vocabulary)
+    return {
+        f"{i:06d}.00000v1": {
+            "title": " ".join(f"w{r}" for r in ranks[i, :10]),
+            "summary": " ".join(f"w{r}" for r in ranks[i]),
+            "authors": [],
+            "pdf_url": "",
+            "published": "2024-01-01",
+        }
+        for i in range(n_papers)
+    }
+
+
+def bench_similarity():
+    from similarity import TfidfIndex
+
+    print("\n→ find_similar_papers : matrice TF-IDF creuse")
+    print(f"{'papiers':>8} {'build (s)':>10} {'reload (s)':>11} {'1re requête (ms)':>17} {'requête (ms)':>13} {'+5 papiers (ms)':>16}")
+    for n_papers in (1000, 10000, 100000):
+        with tempfile.TemporaryDirectory() as paper_dir:
+            store = SqlitePaperStore(os.path.join(paper_dir, "papers.db"))
+            corpus = _synthetic_corpus(n_papers + PAPERS_PER_TOPIC)
+            ids = list(corpus)
+            store.add_papers("bench", {pid: corpus[pid] for pid in ids[:n_papers]})
+            index = TfidfIndex(store, paper_dir)
+
+            start = time.perf_counter()
+            index.build()
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index.similar(ids[0], 5)
+            first = (time.perf_counter() - start) * 1e3
+
+            sample = random.sample(ids[:n_papers], 20)
+            start = time.perf_counter()
+            for paper_id in sample:
+                index.similar(paper_id, 5)
+            query = (time.perf_counter() - start) / len(sample) * 1e3
+
+            # search_papers ajoute 5 papiers : mise à jour incrémentale puis requête
+            start = time.perf_counter()
+            store.add_papers("bench", {pid: corpus[pid] for pid in ids[n_papers:]})
+            index.similar(ids[-1], 5)
+            incremental = (time.perf_counter() - start) * 1e3
+
+            # Redémarrage : la matrice est relue depuis papers/.tfidf.*
+            index.save()
+            start = time.perf_counter()
+            TfidfIndex(store, paper_dir).build()
+            reload = time.perf_counter() - start
+
+            store.close()
+            print(f"{n_papers:>8} {build:>10.2f} {reload:>11.2f} {first:>17.1f} {query:>13.1f} {incremental:>16.1f}")
+
+
+def _render_all(topic: str, papers: dict) -> str:
+    """Ancien rendu de papers://{topic} : tout le topic, concaténé avec +=."""
+    content = f"# Papers on {topic.replace('_', ' ').title()}\n\n"
+    content += f"Total papers: {len(papers)}\n\n"
+    for paper_id, paper_info in papers.items():
+        content += f"## {paper_info['title']}\n"
+        content += f"- **Paper ID**: {paper_id}\n"
+        content += f"- **Authors**: {', '.join(paper_info['authors'])}\n"
+        content += f"- **Published**: {paper_info['published']}\n"
+        content += f"- **PDF URL**: [{paper_info['pdf_url']}]({paper_info['pdf_url']})\n\n"
+        content += f"### Summary\n{paper_info['summary'][:500]}...\n\n"
+        content += "---\n\n"
+    return content
+
+
+def bench_topic_pages():
+    from topic_pages import TopicPages
+
+    print("\n→ papers://{topic} : topic entier vs page de 20 (SQLite)")
+    print(f"{'papiers':>8} {'entier (ms)':>12} {'taille (Ko)':>12} {'page (ms)':>10} {'en cache (ms)':>14}")
+    for size in (100, 1000, 10000):
+        with tempfile.TemporaryDirectory() as paper_dir:
+            store = SqlitePaperStore(os.path.join(paper_dir, "papers.db"))
+            store.add_papers("big", {f"{i:05d}.00000v1": _fake_paper(i) for i in range(size)})
+            pages = TopicPages(store)
+
+            start = time.perf_counter()
+            content = _render_all("big", store.get_topic_papers("big"))
+            full = (time.perf_counter() - start) * 1e3
+
+            # Dernière page : l'OFFSET le plus coûteux
+            last = (size - 1) // 20 + 1
+            start = time.perf_counter()
+            pages.get("big", last, 20)
+            page = (time.perf_counter() - start) * 1e3
+
+            start = time.perf_counter()
+            for _ in range(LOOKUPS):
+                pages.get("big", last, 20)
+            cached = (time.perf_counter() - start) / LOOKUPS * 1e3
+
+            store.close()
+            print(f"{size:>8} {full:>12.1f} {len(content) / 1024:>12.0f} {page:>10.2f} {cached:>14.3f}")
+
+
+if __name__ == "__main__":
+    bench_extract_info()
+    bench_add_papers()
+    check_concurrent_writers()
+    bench_similarity()
+    bench_topic_pages()
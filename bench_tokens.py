@@ -0,0 +1,92 @@
+# Mesure des tokens renvoyés au modèle par les tools du serveur MCP
+# bench_tokens.py
+#
+# Usage: python bench_tokens.py
+# Les tools de servers/research_server.py sont appelés sur les papiers déjà
+# stockés dans papers/ (aucune recherche arXiv), dans chaque format de sortie
+# (cf. servers/output_format.py). Les tokens sont comptés par l'API Anthropic
+# (messages.count_tokens) si ANTHROPIC_API_KEY est définie, sinon estimés à
+# 4 caractères par token.
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MODEL = "claude-3-7-sonnet-20250219"
+# (format, longueur max des résumés) comparés à l'ancienne sortie indentée
+VARIANTS = [("pretty", 0), ("compact", 0), ("minimal", 0), ("minimal", 200)]
+N_PAPERS = 5
+
+
+def _token_counter():
+    load_dotenv()
+    if not os.environ.get("ANTHROPIC_API_KEY"):
+        return lambda text: round(len(text) / 4), "≈ tokens (4 car./token)"
+
+    from anthropic import Anthropic, APIError
+
+    client = Anthropic()
+    try:
+        empty = client.messages.count_tokens(
+            model=MODEL, messages=[{"role": "user", "content": "."}]
+        ).input_tokens
+    except APIError as e:
+        print(f"count_tokens indisponible ({str(e)}), estimation à la place")
+        return lambda text: round(len(text) / 4), "≈ tokens (4 car./token)"
+
+    def count(text: str) -> int:
+        return client.messages.count_tokens(
+            model=MODEL, messages=[{"role": "user", "content": text or "."}]
+        ).input_tokens - empty
+
+    return count, "tokens (count_tokens)"
+
+
+def _text(result) -> str:
+    # call_tool renvoie des blocs de contenu (et parfois un résultat structuré en plus)
+    blocks = result[0] if isinstance(result, tuple) else result
+    return "".join(getattr(block, "text", "") for block in blocks)
+
+
+async def main():
+    sys.path.insert(0, os.path.join(ROOT, "servers"))
+    os.chdir(ROOT)
+    import output_format
+    import research_server as server
+    from research_tools import store
+
+    topics = store.list_topics()
+    if not topics:
+        print("Aucun papier dans papers/ : lancer d'abord une recherche.")
+        return
+    paper_ids = [paper_id for paper_id, _ in store.iter_topic_page(topics[0], 0, N_PAPERS)]
+    count, unit = _token_counter()
+
+    calls = [
+        ("extract_info", lambda fmt, chars: {"paper_id": paper_ids[0], "output_format": fmt, "summary_chars": chars}),
+        ("get_papers", lambda fmt, chars: {"paper_ids": paper_ids, "output_format": fmt, "summary_chars": chars}),
+        ("get_papers (titre)", lambda fmt, chars: {"paper_ids": paper_ids, "fields": ["title"], "output_format": fmt}),
+        ("search_local", lambda fmt, chars: {"query": topics[0].replace("_", " "), "k": N_PAPERS}),
+        ("find_similar_papers", lambda fmt, chars: {"paper_id": paper_ids[0], "k": N_PAPERS}),
+    ]
+
+    header = " ".join(f"{fmt + (f'/{chars}' if chars else ''):>12}" for fmt, chars in VARIANTS)
+    print(f"→ {unit} par sortie de tool, {N_PAPERS} papiers du topic {topics[0]}")
+    print(f"{'tool':>20} {header} {'gain':>6}")
+    for label, arguments in calls:
+        tool = label.split(" ")[0]
+        counts = []
+        for fmt, chars in VARIANTS:
+            # Les tools sans option de format suivent la configuration du serveur
+            output_format.DEFAULT_FORMAT = fmt
+            output_format.DEFAULT_SUMMARY_CHARS = chars
+            result = await server.mcp.call_tool(tool, arguments(fmt, chars))
+            counts.append(count(_text(result)))
+        saving = 1 - min(counts) / counts[0] if counts[0] else 0
+        print(f"{label:>20} " + " ".join(f"{n:>12}" for n in counts) + f" {saving:>6.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Token budget of the conversation sent back to the model in the tool loop.
+
+Each iteration of process_query resends every message so far, and tool results
+(a full `fetch` page, a long list of papers) pile up until the calls get slow
+and the request no longer fits. ContextBudget estimates the tokens of each
+message and, once the total exceeds MCP_CONTEXT_BUDGET, replaces the oldest
+tool_result payloads by a short preview, oldest first, until it fits again.
+The query and the last MCP_KEEP_TURNS turns (assistant message + its tool
+results) are always kept verbatim.
+
+An elided result stays elided: the prefix of the next calls does not change
+again, so it can still be read from the prompt cache (see prompt_cache.py).
+"""
+
+import json
+import os
+from typing import Any, Dict, List
+
+
+CONTEXT_BUDGET = int(os.environ.get("MCP_CONTEXT_BUDGET", "60000"))
+KEEP_TURNS = int(os.environ.get("MCP_KEEP_TURNS", "2"))
+PREVIEW_CHARS = int(os.environ.get("MCP_ELIDED_PREVIEW_CHARS", "300"))
+# Same estimate as bench_tokens.py without the API: 4 characters per token
+CHARS_PER_TOKEN = 4
+
+
+def _field(block: Any, name: str, default: Any = None) -> Any:
+    # Blocks are dicts (built by the client) or SDK/MCP models (from responses)
+    if isinstance(block, dict):
+        return block.get(name, default)
+    return getattr(block, name, default)
+
+
+def content_text(content: Any) -> str:
+    """The text carried by a message content (string, blocks, tool_use input...)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(content_text(block) for block in content)
+    block_type = _field(content, "type")
+    if block_type == "tool_use":
+        return f"{_field(content, 'name', '')}{json.dumps(_field(content, 'input', {}))}"
+    if block_type == "tool_result":
+        return content_text(_field(content, "content", ""))
+    return _field(content, "text", "") or ""
+
+
+def estimate_tokens(message: Dict[str, Any]) -> int:
+    return len(content_text(message["content"])) // CHARS_PER_TOKEN + 1
+
+
+class ContextBudget:
+    def __init__(self, max_tokens: int = CONTEXT_BUDGET, keep_turns: int = KEEP_TURNS,
+                 preview_chars: int = PREVIEW_CHARS):
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.preview_chars = preview_chars
+        # tool_use ids of the results elided so far
+        self.elided = set()
+
+    def _elide(self, block: Dict[str, Any], tool_name: str) -> None:
+        text = content_text(block.get("content", ""))
+        preview = text[: self.preview_chars].rstrip()
+        block["content"] = (
+            f"[Elided to save context: result of {tool_name} ({len(text)} characters). "
+            f"Call the tool again if the full result is needed. Start: {preview}...]"
+        )
+
+    def fit(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Elide old tool results in place until `messages` fits in the budget.
+
+        Returns:
+            The estimated number of tokens of the messages afterwards
+        """
+        sizes = [estimate_tokens(message) for message in messages]
+        total = sum(sizes)
+        if total <= self.max_tokens:
+            return total
+
+        # A turn is an assistant message followed by the user message with its
+        # tool results; the first message (the query) is never touched
+        tool_names = {}
+        turns = []
+        for index, message in enumerate(messages):
+            if message["role"] == "assistant":
+                turns.append(index)
+                if isinstance(message["content"], list):
+                    for block in message["content"]:
+                        if _field(block, "type") == "tool_use":
+                            tool_names[_field(block, "id")] = _field(block, "name")
+        kept = turns[-self.keep_turns:] if self.keep_turns > 0 else []
+        first_kept = kept[0] if kept else len(messages)
+
+        for index in range(1, first_kept):
+            message = messages[index]
+            if message["role"] != "user" or not isinstance(message["content"], list):
+                continue
+            for block in message["content"]:
+                if (
+                    isinstance(block, dict)
+                    and block.get("type") == "tool_result"
+                    and block.get("tool_use_id") not in self.elided
+                    and len(content_text(block.get("content", ""))) > self.preview_chars
+                ):
+                    self._elide(block, tool_names.get(block.get("tool_use_id"), "a tool"))
+                    self.elided.add(block.get("tool_use_id"))
+            new_size = estimate_tokens(message)
+            total -= sizes[index] - new_size
+            sizes[index] = new_size
+            if total <= self.max_tokens:
+                break
+        return total
@@ -1,82 +1,142 @@
 # Lesson 7: Adding Prompt & Resource Features
 
 from dotenv import load_dotenv
-from anthropic import Anthropic
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from anthropic import AsyncAnthropic
 from contextlib import AsyncExitStack
 import json
 import asyncio
-import nest_asyncio
 import os
+import time
+
+from context_budget import ContextBudget
+from prompt_cache import CacheStats, cached_messages, cached_tools
+from server_connections import IDLE_TIMEOUT, LazySession, ServerConnection, is_lazy, list_catalog
+from server_manifest import ServerManifest, same_catalog, server_version
+from tool_cache import CachedSession, ToolCache
+from tool_dispatch import ToolDispatcher
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(BASE_DIR)
 CONFIG_PATH = os.path.join(PROJECT_ROOT, "config", "server_config_L7.json")
 
-nest_asyncio.apply()
-
 load_dotenv()
 
 class MCP_ChatBot:
     def __init__(self):
         self.exit_stack = AsyncExitStack()
-        self.anthropic = Anthropic()
+        # Async client: a generation no longer blocks the event loop (tool calls, servers starting)
+        self.anthropic = AsyncAnthropic()
         # Tools list required for Anthropic API
         self.available_tools = []
         # Prompts list for quick display
         self.available_prompts = []
         # Sessions dict maps tool/prompt names or resource URIs to MCP client sessions
         self.sessions = {}
+        # Runs the tool calls of a model turn concurrently
+        self.dispatcher = ToolDispatcher()
+        # One background connection per server, and the servers still starting
+        self.connections = []
+        self.pending_servers = []
+        # Catalogs cached on disk (.mcp_cache/manifest.json): the tools are known
+        # before the servers are up, and lazy servers start on first use
+        self.manifest = ServerManifest()
+        # server name -> (session, catalog), in configuration order (None until registered)
+        self.servers = {}
+        # Cached/uncached input tokens and latency of the model calls of the session
+        self.cache_stats = CacheStats()
+        # Elides old tool results once the conversation exceeds MCP_CONTEXT_BUDGET tokens
+        self.context = ContextBudget()
+        # Results of idempotent tools and papers:// resources, shared by all servers;
+        # the details of the papers found by a search are prefetched into it
+        self.tool_cache = ToolCache()
 
     async def connect_to_server(self, server_name, server_config):
-        try:
-            server_params = StdioServerParameters(**server_config)
-            stdio_transport = await self.exit_stack.enter_async_context(
-                stdio_client(server_params)
+        """
+        Start one server and return (session, catalog) once it is listed, or None
+        if it is already registered from its cached catalog, failed or is late.
+        """
+        connection = ServerConnection(server_name, server_config)
+        self.connections.append(connection)
+        lazy = is_lazy(server_name)
+        # Calls wait for a server still starting; only lazy servers stop when idle.
+        # Repeated calls to cached tools do not reach the server at all
+        session = CachedSession(LazySession(connection, IDLE_TIMEOUT if lazy else None), server_name, self.tool_cache)
+
+        cached = self.manifest.get(server_name, server_config)
+        if cached is not None:
+            # Usable right away (registered before the server can even start, so
+            # the check below always finds it), checked against the server once it runs
+            self.register_server(server_name, session, cached["catalog"])
+            connection.on_ready(
+                lambda live: self.revalidate_catalog(server_name, server_config, connection, session, live, cached)
             )
-            read, write = stdio_transport
-            session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
-            )
-            await session.initialize()
-
+            if not lazy:
+                connection.start()
+            return None
 
-            try:
-                # List available tools
-                response = await session.list_tools()
-                for tool in response.tools:
-                    self.sessions[tool.name] = session
-                    self.available_tools.append({
-                        "name": tool.name,
-                        "description": tool.description,
-                        "input_schema": tool.inputSchema
-                    })
-
-                # List available prompts
-                prompts_response = await session.list_prompts()
-                if prompts_response and prompts_response.prompts:
-                    for prompt in prompts_response.prompts:
-                        self.sessions[prompt.name] = session
-                        self.available_prompts.append({
-                            "name": prompt.name,
-                            "description": prompt.description,
-                            "arguments": prompt.arguments
-                        })
-                # List available resources
-                resources_response = await session.list_resources()
-                if resources_response and resources_response.resources:
-                    for resource in resources_response.resources:
-                        resource_uri = str(resource.uri)
-                        self.sessions[resource_uri] = session
-
-            except Exception as e:
-                print(f"Error {e}")
+        try:
+            live = await connection.wait_ready()
+            catalog = await list_catalog(live, server_name)
+            self.manifest.put(server_name, server_config, catalog, connection.server_info)
+            # Spawned only to list its catalog: a lazy server stops if no call follows
+            session.session.idle_from_now()
+            return session, catalog
+        except asyncio.TimeoutError:
+            print(f"{server_name} is still starting, its tools will be available once it is ready")
+            self.pending_servers.append(asyncio.create_task(
+                self.finish_connecting(server_name, server_config, connection, session)
+            ))
+        except Exception as e:
+            print(f"Error connecting to {server_name}: {e}")
+        return None
 
+    async def finish_connecting(self, server_name, server_config, connection, session):
+        """Register a server that missed the startup timeout as soon as it is ready."""
+        try:
+            live = await connection.wait_ready(timeout=None)
+            catalog = await list_catalog(live, server_name)
+            self.manifest.put(server_name, server_config, catalog, connection.server_info)
+            session.session.idle_from_now()
+            self.register_server(server_name, session, catalog)
+            print(f"\n{server_name} is ready")
         except Exception as e:
             print(f"Error connecting to {server_name}: {e}")
 
+    async def revalidate_catalog(self, server_name, server_config, connection, session, live, cached):
+        """List a server started from a cached catalog, and switch to its real catalog if it changed."""
+        try:
+            catalog = await list_catalog(live, server_name)
+        except Exception as e:
+            print(f"Error listing {server_name}: {e}")
+            return
+        self.manifest.put(server_name, server_config, catalog, connection.server_info)
+        if not same_catalog(catalog, cached["catalog"]):
+            if server_version(connection.server_info) != cached.get("server"):
+                print(f"\n{server_name} was updated to {server_version(connection.server_info)}")
+            print(f"\n{server_name}: tools, prompts or resources changed, catalog updated")
+            self.register_server(server_name, session, catalog)
+
+    def register_server(self, server_name, session, catalog):
+        """Route the tools, prompts and resources of a catalog (see list_catalog) to a session."""
+        self.servers[server_name] = (session, catalog)
+        # Rebuilt rather than mutated: a query in progress keeps a consistent list
+        sessions, tools, prompts = {}, [], []
+        for server in self.servers.values():
+            if server is None:
+                # Not registered yet: only holds its place in the configuration order
+                continue
+            server_session, server_catalog = server
+            for tool in server_catalog["tools"]:
+                sessions[tool["name"]] = server_session
+                tools.append(tool)
+            for prompt in server_catalog["prompts"]:
+                sessions[prompt["name"]] = server_session
+                prompts.append(prompt)
+            for resource_uri in server_catalog["resources"]:
+                sessions[resource_uri] = server_session
+        self.sessions, self.available_tools, self.available_prompts = sessions, tools, prompts
+
     async def connect_to_servers(self):
         try:
             # with open("server_config_L7.json", "r") as file:
@@ -85,8 +145,19 @@ class MCP_ChatBot:
             servers = data.get("mcpServers", {})
             print(f"Debug - servers: {servers}")
 
-            for server_name, server_config in servers.items():
-                await self.connect_to_server(server_name, server_config)
+            # Tools are listed in configuration order, whichever server registers first
+            for server_name in servers:
+                self.servers.setdefault(server_name, None)
+            # All servers start at the same time; each one is bounded by MCP_SERVER_TIMEOUT.
+            # Servers with a cached catalog register themselves without waiting
+            results = await asyncio.gather(*(
+                self.connect_to_server(server_name, server_config)
+                for server_name, server_config in servers.items()
+            ))
+            # Only the servers listed live during startup are left to register
+            for server_name, result in zip(servers, results):
+                if result is not None:
+                    self.register_server(server_name, *result)
         except Exception as e:
             print(f"Error loading server config: {e}")
             raise
@@ -95,47 +166,51 @@ class MCP_ChatBot:
         messages = [{'role':'user', 'content':query}]
 
         while True:
-            response = self.anthropic.messages.create(
-                max_tokens = 2024,
-                model = 'claude-3-7-sonnet-20250219',
-                tools = self.available_tools,
-                messages = messages
-            )
-
-            assistant_content = []
-            has_tool_use = False
-
-            for content in response.content:
-                if content.type == 'text':
-                    print(content.text)
-                    assistant_content.append(content)
-                elif content.type == 'tool_use':
-                    has_tool_use = True
-                    assistant_content.append(content)
-                    messages.append({'role':'assistant', 'content':assistant_content})
-
-                    # Get session and call tool
-                    session = self.sessions.get(content.name)
-                    if not session:
-                        print(f"Tool '{content.name}' not found.")
-                        break
-
-                    result = await session.call_tool(content.name, arguments=content.input)
-                    messages.append({
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": content.id,
-                                "content": result.content
-                            }
-                        ]
-                    })
+            # Text is printed as it streams, and each tool starts as soon as its
+            # tool_use block is complete, while the rest of the response streams
+            elided = len(self.context.elided)
+            self.context.fit(messages)
+            if len(self.context.elided) > elided:
+                print(f"[{len(self.context.elided) - elided} old tool results elided to fit the context budget]")
+
+            tool_calls = []
+            started = time.perf_counter()
+            first_event_at = None
+            try:
+                # Breakpoints on the tools and the latest message: the next call
+                # of the loop reads the catalog and every earlier turn from the cache
+                async with self.anthropic.messages.stream(
+                    max_tokens = 2024,
+                    model = 'claude-3-7-sonnet-20250219',
+                    tools = cached_tools(self.available_tools),
+                    messages = cached_messages(messages)
+                ) as stream:
+                    async for event in stream:
+                        if first_event_at is None:
+                            first_event_at = time.perf_counter()
+                        if event.type == 'text':
+                            print(event.text, end='', flush=True)
+                        elif event.type == 'content_block_stop':
+                            if event.content_block.type == 'text':
+                                print()
+                            elif event.content_block.type == 'tool_use':
+                                tool_calls.append(self.dispatcher.start(event.content_block, self.sessions.get))
+                    response = await stream.get_final_message()
+                self.cache_stats.record(response.usage, started, first_event_at)
+            except BaseException:
+                for call in tool_calls:
+                    call.cancel()
+                raise
 
             # Exit loop if no tool was used
-            if not has_tool_use:
+            if not tool_calls:
                 break
 
+            # One assistant message for the whole turn; the results keep the tool_use order
+            messages.append({'role':'assistant', 'content':response.content})
+            tool_results = await asyncio.gather(*tool_calls)
+            messages.append({"role": "user", "content": list(tool_results)})
+
     async def get_resource(self, resource_uri):
         session = self.sessions.get(resource_uri)
 
@@ -213,7 +288,8 @@ class MCP_ChatBot:
 
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                # Read in a thread: servers still starting keep progressing meanwhile
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
                 if not query:
                     continue
 
@@ -263,6 +339,17 @@ class MCP_ChatBot:
                 print(f"\nError: {str(e)}")
 
     async def cleanup(self):
+        if self.cache_stats.calls:
+            print(f"\n{self.cache_stats.report()}")
+        if self.tool_cache.counters["hits"]:
+            stats = self.tool_cache.stats()
+            print(f"Tool cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['invalidations']} invalidated, "
+                  f"{stats['prefetch_hits']}/{stats['prefetched']} prefetches used")
+        self.tool_cache.cancel_prefetches()
+        for task in self.pending_servers:
+            task.cancel()
+        await asyncio.gather(*(connection.close() for connection in self.connections))
         await self.exit_stack.aclose()
 
 
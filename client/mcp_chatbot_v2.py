@@ -9,6 +9,7 @@ from typing import List, Dict, TypedDict
 from contextlib import AsyncExitStack
 import json
 import asyncio
+from tool_dispatch import ToolDispatcher
 
 load_dotenv()
 
@@ -26,6 +27,7 @@ class MCP_ChatBot:
         self.anthropic = Anthropic()
         self.available_tools: List[ToolDefinition] = [] # new
         self.tool_to_session: Dict[str, ClientSession] = {} # new
+        self.dispatcher = ToolDispatcher() # runs the tool calls of a turn concurrently
 
 
     async def connect_to_server(self, server_name: str, server_config: dict) -> None:
@@ -73,49 +75,29 @@ class MCP_ChatBot:
 
     async def process_query(self, query):
         messages = [{'role':'user', 'content':query}]
-        response = self.anthropic.messages.create(max_tokens = 2024,
+        while True:
+            response = self.anthropic.messages.create(max_tokens = 2024,
                                       model = 'claude-3-7-sonnet-20250219',
                                       tools = self.available_tools,
                                       messages = messages)
-        process_query = True
-        while process_query:
             assistant_content = []
+            tool_uses = []
             for content in response.content:
                 if content.type =='text':
                     print(content.text)
                     assistant_content.append(content)
-                    if(len(response.content) == 1):
-                        process_query= False
                 elif content.type == 'tool_use':
                     assistant_content.append(content)
-                    messages.append({'role':'assistant', 'content':assistant_content})
-                    tool_id = content.id
-                    tool_args = content.input
-                    tool_name = content.name
-
-
-                    print(f"Calling tool {tool_name} with args {tool_args}")
-
-                    # Call a tool
-                    session = self.tool_to_session[tool_name] # new
-                    result = await session.call_tool(tool_name, arguments=tool_args)
-                    messages.append({"role": "user",
-                                      "content": [
-                                          {
-                                              "type": "tool_result",
-                                              "tool_use_id":tool_id,
-                                              "content": result.content
-                                          }
-                                      ]
-                                    })
-                    response = self.anthropic.messages.create(max_tokens = 2024,
-                                      model = 'claude-3-7-sonnet-20250219',
-                                      tools = self.available_tools,
-                                      messages = messages)
+                    tool_uses.append(content)
+
+            if not tool_uses:
+                break
 
-                    if(len(response.content) == 1 and response.content[0].type == "text"):
-                        print(response.content[0].text)
-                        process_query= False
+            # Call every tool of this turn concurrently, then send all the
+            # results back in one message, in the order of the tool_use blocks
+            messages.append({'role':'assistant', 'content':assistant_content})
+            tool_results = await self.dispatcher.run_turn(tool_uses, self.tool_to_session.get) # new
+            messages.append({"role": "user", "content": tool_results})
 
 
 
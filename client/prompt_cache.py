@@ -0,0 +1,116 @@
+"""
+Prompt caching of the stable prefix of each model call.
+
+Every iteration of the tool loop resends the tool catalog and the whole
+conversation so far. The prefix is marked with cache breakpoints
+(cache_control): one on the last tool, which covers the catalog across
+queries, and one on the last block of the latest message, so the next call of
+the loop reads every earlier turn from the cache and only pays for the new
+tool results. (The chatbots send no system prompt: tools come first in the
+prefix, then the messages.)
+
+The API reports the cached tokens in `response.usage`; CacheStats adds them up
+with the latency of each call and reports what the cache saved over the
+session. Set MCP_PROMPT_CACHE=0 to send the requests unmarked.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+
+PROMPT_CACHE = os.environ.get("MCP_PROMPT_CACHE", "1").lower() not in ("0", "false", "no")
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Price of cached input tokens relative to regular input tokens
+CACHE_WRITE_COST = 1.25
+CACHE_READ_COST = 0.1
+
+
+def _with_breakpoint(block: Any) -> Dict[str, Any]:
+    # Blocks coming from a response are SDK models: sent back as plain dicts
+    if not isinstance(block, dict):
+        block = block.model_dump(exclude_none=True)
+    return {**block, "cache_control": CACHE_CONTROL}
+
+
+def cached_tools(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The tool list with a breakpoint on its last tool (the list itself is not modified)."""
+    if not PROMPT_CACHE or not tools:
+        return tools
+    return tools[:-1] + [_with_breakpoint(tools[-1])]
+
+
+def cached_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    The messages with a breakpoint on the last block of the latest message;
+    earlier messages are shared, not copied.
+    """
+    if not PROMPT_CACHE or not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if not content:
+        return messages
+    return messages[:-1] + [{**last, "content": content[:-1] + [_with_breakpoint(content[-1])]}]
+
+
+class CacheStats:
+    def __init__(self):
+        self.calls = 0
+        self.cached_calls = 0
+        self.input_tokens = 0
+        self.cache_write_tokens = 0
+        self.cache_read_tokens = 0
+        # Seconds until the first streamed event, for calls with and without cache reads
+        self.first_event = {True: 0.0, False: 0.0}
+
+    def record(self, usage: Any, started: float, first_event_at: Optional[float] = None) -> None:
+        """Add the usage of one response; `started`/`first_event_at` come from perf_counter."""
+        read = getattr(usage, "cache_read_input_tokens", None) or 0
+        self.calls += 1
+        self.cached_calls += bool(read)
+        self.input_tokens += usage.input_tokens or 0
+        self.cache_write_tokens += getattr(usage, "cache_creation_input_tokens", None) or 0
+        self.cache_read_tokens += read
+        self.first_event[bool(read)] += (first_event_at or time.perf_counter()) - started
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Input tokens of every call, as they would have been billed without caching."""
+        return self.input_tokens + self.cache_write_tokens + self.cache_read_tokens
+
+    @property
+    def saved_tokens(self) -> float:
+        """Input tokens saved, counting cached tokens at their relative price."""
+        billed = (
+            self.input_tokens
+            + CACHE_WRITE_COST * self.cache_write_tokens
+            + CACHE_READ_COST * self.cache_read_tokens
+        )
+        return self.prompt_tokens - billed
+
+    def report(self) -> str:
+        if not self.calls:
+            return "Prompt cache: no model call."
+        lines = [
+            f"Prompt cache: {self.calls} calls, {self.prompt_tokens} input tokens "
+            f"({self.cache_read_tokens} read from cache, {self.cache_write_tokens} written, "
+            f"{self.input_tokens} uncached)"
+        ]
+        if self.prompt_tokens:
+            lines.append(
+                f"  input cost saved: {self.saved_tokens:.0f} token-equivalents "
+                f"({self.saved_tokens / self.prompt_tokens:.0%})"
+            )
+        uncached_calls = self.calls - self.cached_calls
+        if self.cached_calls and uncached_calls:
+            with_cache = self.first_event[True] / self.cached_calls
+            without_cache = self.first_event[False] / uncached_calls
+            lines.append(
+                f"  time to first token: {with_cache:.2f} s with cache reads, "
+                f"{without_cache:.2f} s without ({without_cache - with_cache:.2f} s saved per call)"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,211 @@
+"""
+Connections to the MCP servers of the chatbot, started concurrently.
+
+Each server gets its own background task that spawns the process, opens the
+ClientSession and keeps both open until close(): the stdio transport uses
+anyio task groups, which must be exited by the task that entered them, so the
+sessions cannot be entered in parallel on one shared AsyncExitStack.
+
+A server slower than MCP_SERVER_TIMEOUT seconds (e.g. a first `npx` download)
+does not hold up the chatbot: the caller gets a TimeoutError and the server
+keeps starting in the background.
+
+In lazy mode (MCP_LAZY_SERVERS) a server is represented by a LazySession: its
+process is only spawned by the first call routed to it, and stopped again after
+MCP_IDLE_TIMEOUT seconds without calls.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+
+SERVER_TIMEOUT = float(os.environ.get("MCP_SERVER_TIMEOUT", "20"))
+IDLE_TIMEOUT = float(os.environ.get("MCP_IDLE_TIMEOUT", "300"))
+
+
+def lazy_servers() -> Set[str]:
+    """Names of the servers to start lazily ("all" or "1" for every server)."""
+    names = {name.strip() for name in os.environ.get("MCP_LAZY_SERVERS", "").split(",") if name.strip()}
+    return {"*"} if names & {"all", "1", "true"} else names
+
+
+def is_lazy(server_name: str) -> bool:
+    names = lazy_servers()
+    return "*" in names or server_name in names
+
+
+class ServerConnection:
+    def __init__(self, name: str, config: dict):
+        self.name = name
+        self.params = StdioServerParameters(**config)
+        # Implementation (name, version) reported by the server at initialize
+        self.server_info: Any = None
+        self._ready: Optional[asyncio.Future] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._on_ready: List[Callable[[ClientSession], Awaitable[None]]] = []
+        self._callbacks: Set[asyncio.Task] = set()
+
+    def on_ready(self, callback: Callable[[ClientSession], Awaitable[None]]) -> None:
+        """Run `callback(session)` once, the next time the server is initialized."""
+        self._on_ready.append(callback)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Spawn the server in a background task (returns immediately)."""
+        if not self.running:
+            # A server that exited is spawned again
+            self._ready = asyncio.get_running_loop().create_future()
+            self._closing = asyncio.Event()
+            self._task = asyncio.create_task(self._run(self._ready, self._closing), name=f"mcp-{self.name}")
+
+    async def _run(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    init = await session.initialize()
+                    self.server_info = getattr(init, "serverInfo", None)
+                    ready.set_result(session)
+                    callbacks, self._on_ready = self._on_ready, []
+                    for callback in callbacks:
+                        task = asyncio.create_task(callback(session))
+                        self._callbacks.add(task)
+                        task.add_done_callback(self._callbacks.discard)
+                    await closing.wait()
+        except BaseException as e:
+            # Reported by whoever awaits wait_ready()
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else ConnectionError(str(e)))
+            if not isinstance(e, Exception):
+                raise
+
+    async def wait_ready(self, timeout: Optional[float] = SERVER_TIMEOUT) -> ClientSession:
+        """
+        Wait for the session to be initialized. On timeout the server keeps
+        starting: call wait_ready again (without timeout) to get it later.
+        """
+        self.start()
+        # shield: a timeout must not cancel the startup itself
+        return await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+
+    async def close(self) -> None:
+        task, ready, closing = self._task, self._ready, self._closing
+        if task is None:
+            return
+        # A call arriving while we shut down spawns a fresh process
+        self._task = None
+        closing.set()
+        if not ready.done():
+            # Still starting: nothing to shut down cleanly
+            task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass
+
+
+class LazySession:
+    """
+    Stands for the ClientSession of a server spawned on first use (call_tool,
+    get_prompt, read_resource) and shut down after `idle_timeout` seconds
+    without calls. The next call spawns it again.
+
+    With `idle_timeout=None` the server is never stopped: calls simply wait
+    for a server that is still starting.
+    """
+
+    def __init__(self, connection: ServerConnection, idle_timeout: Optional[float] = IDLE_TIMEOUT):
+        self.connection = connection
+        self.idle_timeout = idle_timeout
+        self._active = 0
+        self._last_used = time.monotonic()
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def _call(self, method: str, *args, **kwargs) -> Any:
+        if not self.connection.running:
+            print(f"Starting {self.connection.name}...")
+        self._active += 1
+        try:
+            session = await self.connection.wait_ready(timeout=None)
+            return await getattr(session, method)(*args, **kwargs)
+        finally:
+            self._active -= 1
+            self.idle_from_now()
+
+    def idle_from_now(self) -> None:
+        """
+        Count the idle time from now, as at the end of a call. Also used once the
+        catalog of a server spawned at startup is listed, which is not a call.
+        """
+        self._last_used = time.monotonic()
+        if self.idle_timeout is not None and (self._watcher is None or self._watcher.done()):
+            self._watcher = asyncio.create_task(self._stop_when_idle())
+
+    async def _stop_when_idle(self) -> None:
+        while True:
+            idle = time.monotonic() - self._last_used
+            if idle < self.idle_timeout or self._active:
+                await asyncio.sleep(max(self.idle_timeout - idle, 1.0))
+                continue
+            if self.connection.running:
+                await self.connection.close()
+                print(f"\n{self.connection.name} stopped after {self.idle_timeout:.0f} s without calls")
+            return
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None) -> Any:
+        return await self._call("call_tool", name, arguments=arguments)
+
+    async def get_prompt(self, name: str, arguments: Optional[dict] = None) -> Any:
+        return await self._call("get_prompt", name, arguments=arguments)
+
+    async def read_resource(self, uri: Any) -> Any:
+        return await self._call("read_resource", uri=uri)
+
+    async def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+        await self.connection.close()
+
+
+async def list_catalog(session: ClientSession, server_name: str) -> Dict[str, list]:
+    """
+    Tools, prompts and resources of a session, listed concurrently, as plain
+    JSON-compatible data (see register_server). A server that does not
+    implement prompts or resources simply has none.
+    """
+    responses = await asyncio.gather(
+        session.list_tools(), session.list_prompts(), session.list_resources(),
+        return_exceptions=True,
+    )
+    items = {}
+    for kind, response in zip(("tools", "prompts", "resources"), responses):
+        if isinstance(response, Exception):
+            if kind == "tools":
+                print(f"Error listing {kind} of {server_name}: {response}")
+            items[kind] = []
+        else:
+            items[kind] = getattr(response, kind, None) or []
+
+    return {
+        "tools": [
+            {"name": tool.name, "description": tool.description, "input_schema": tool.inputSchema}
+            for tool in items["tools"]
+        ],
+        "prompts": [
+            {
+                "name": prompt.name,
+                "description": prompt.description,
+                "arguments": [argument.model_dump() for argument in prompt.arguments or []],
+            }
+            for prompt in items["prompts"]
+        ],
+        "resources": [str(resource.uri) for resource in items["resources"]],
+    }
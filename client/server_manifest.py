@@ -0,0 +1,79 @@
+"""
+On-disk cache of the catalogs (tools, prompts, resources) of the MCP servers.
+
+It lets the chatbot build its tool list at launch without waiting for the
+servers, and register the tools of a lazy server without spawning it (see
+LazySession). An entry is only used for the command, arguments and environment
+it was listed with, and records the server name and version reported at
+initialize; once the server runs, its catalog is listed again in the background
+and replaces the cached one if the version or the catalog changed.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.environ.get(
+    "MCP_MANIFEST_PATH", os.path.join(PROJECT_ROOT, ".mcp_cache", "manifest.json")
+)
+
+
+def server_version(server_info: Any) -> Optional[str]:
+    """"name version" of the Implementation reported by a server at initialize."""
+    if server_info is None:
+        return None
+    return f"{server_info.name} {server_info.version}"
+
+
+def same_catalog(catalog: dict, other: dict) -> bool:
+    # Compared as JSON: a cached catalog has lists where a fresh one may have tuples
+    return json.dumps(catalog, sort_keys=True) == json.dumps(other, sort_keys=True)
+
+
+def config_key(server_config: dict) -> str:
+    return json.dumps(
+        {key: server_config.get(key) for key in ("command", "args", "env", "cwd")},
+        sort_keys=True,
+    )
+
+
+class ServerManifest:
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        # server name -> {"config": config_key, "server": server_version, "catalog": {...}}
+        self.servers: Dict[str, dict] = {}
+        try:
+            with open(path, "r") as manifest_file:
+                self.servers = json.load(manifest_file).get("servers", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable server manifest {path}: {e}")
+
+    def get(self, server_name: str, server_config: dict) -> Optional[dict]:
+        """
+        Cached entry ({"server": version, "catalog": {...}}) of a server, or None
+        if it is unknown or was configured differently.
+        """
+        entry = self.servers.get(server_name)
+        if entry is None or entry.get("config") != config_key(server_config):
+            return None
+        return entry
+
+    def put(self, server_name: str, server_config: dict, catalog: dict, server_info: Any = None) -> None:
+        entry = {"config": config_key(server_config), "server": server_version(server_info), "catalog": catalog}
+        if entry != self.servers.get(server_name):
+            self.servers[server_name] = entry
+            self.save()
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as manifest_file:
+                json.dump({"servers": self.servers}, manifest_file, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving server manifest {self.path}: {e}")
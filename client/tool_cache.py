@@ -0,0 +1,340 @@
+"""
+Client-side cache of the results of idempotent tools and resources.
+
+The model often repeats the same extract_info / get_papers calls, or the same
+papers:// resource, across the turns and queries of one session; each call
+crosses the stdio pipe again. Results are cached by (server, tool, canonical
+arguments), in an LRU bounded in size and entries expire after a TTL. Only the
+tools listed in MCP_CACHED_TOOLS and the resources under MCP_CACHED_RESOURCES
+are cached, and error results never are.
+
+Each entry is tagged with what it depends on: its topic, its paper IDs, or the
+whole corpus (search_local, find_similar_papers, papers://folders...). A
+tool listed in MCP_CORPUS_TOOLS depends on the corpus whatever its arguments:
+the similar papers of one ID change with every search. A successful call to a
+mutating tool (MCP_MUTATING_TOOLS, e.g. search_papers) drops the entries of its
+topic, of the paper IDs it returned and of the corpus.
+
+The paper IDs returned by a mutating call are then prefetched: extract_info is
+called for each of them in the background, while the model is still writing
+its next turn, and the follow-up extract_info calls of the model are answered
+from the cache (or join the prefetch still in flight).
+
+Configuration (environment variables):
+  MCP_CACHED_TOOLS      tools whose results are cached (comma-separated)
+  MCP_CACHED_RESOURCES  URI prefixes of the cached resources (comma-separated)
+  MCP_MUTATING_TOOLS    tools that invalidate the entries they touch
+  MCP_CORPUS_TOOLS      tools whose results depend on the whole corpus
+  MCP_TOOL_CACHE_TTL    time to live in seconds, 0 disables the cache (default: 600)
+  MCP_TOOL_CACHE_SIZE   maximum number of entries (default: 256)
+  MCP_PREFETCH_TOOL     tool prefetched for the returned IDs, empty disables (default: extract_info)
+  MCP_PREFETCH_MAX      maximum number of IDs prefetched per call (default: 10)
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+DEFAULT_TOOLS = "extract_info,get_papers,search_local,find_similar_papers"
+DEFAULT_RESOURCES = "papers://"
+DEFAULT_MUTATING = "search_papers,search_papers_batch,refresh_topic"
+DEFAULT_CORPUS_TOOLS = "search_local,find_similar_papers"
+DEFAULT_TTL = 600
+DEFAULT_SIZE = 256
+DEFAULT_PREFETCH_TOOL = "extract_info"
+DEFAULT_PREFETCH_MAX = 10
+# Prefetched calls in flight at once, so a search does not flood the server
+PREFETCH_CONCURRENCY = 4
+
+CORPUS = "corpus"
+
+
+def _names(value: str) -> Set[str]:
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def topic_key(topic: str) -> str:
+    # Same normalization as the research server (paper_store.topic_key)
+    return str(topic).lower().replace(" ", "_")
+
+
+def canonical_arguments(arguments: Optional[dict]) -> str:
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def argument_tags(arguments: Optional[dict]) -> Set[str]:
+    """What a call depends on: its topics and paper IDs, else the whole corpus."""
+    arguments = arguments or {}
+    tags = set()
+    topics = arguments.get("topics") or []
+    if arguments.get("topic") is not None:
+        topics = [arguments["topic"], *topics]
+    tags.update(f"topic:{topic_key(topic)}" for topic in topics)
+    paper_ids = arguments.get("paper_ids") or []
+    if arguments.get("paper_id") is not None:
+        paper_ids = [arguments["paper_id"], *paper_ids]
+    tags.update(f"paper:{paper_id}" for paper_id in paper_ids)
+    return tags or {CORPUS}
+
+
+def resource_tags(uri: str) -> Set[str]:
+    """papers://<topic>[/page/...] depends on its topic, papers://folders on the corpus."""
+    if uri.startswith("papers://"):
+        topic = uri[len("papers://"):].split("/", 1)[0]
+        if topic and topic != "folders":
+            return {f"topic:{topic_key(topic)}"}
+    return {CORPUS}
+
+
+def _strings(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def result_strings(result: Any) -> List[str]:
+    """Strings of a tool result (e.g. the paper IDs returned by search_papers), in order."""
+    strings = list(_strings(getattr(result, "structuredContent", None) or {}))
+    for block in getattr(result, "content", None) or []:
+        text = getattr(block, "text", None)
+        if text is None:
+            continue
+        try:
+            value = json.loads(text)
+        except ValueError:
+            value = None
+        # A bare ID such as 2401.01234 would parse as a number
+        if isinstance(value, (dict, list)):
+            strings.extend(_strings(value))
+        else:
+            strings.append(text)
+    return list(dict.fromkeys(strings))
+
+
+class ToolCache:
+    def __init__(
+        self,
+        tools: Optional[Set[str]] = None,
+        resources: Optional[Set[str]] = None,
+        mutating: Optional[Set[str]] = None,
+        corpus_tools: Optional[Set[str]] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        prefetch_tool: Optional[str] = None,
+        prefetch_max: Optional[int] = None,
+    ):
+        self.tools = _names(os.environ.get("MCP_CACHED_TOOLS", DEFAULT_TOOLS)) if tools is None else tools
+        self.resources = (
+            _names(os.environ.get("MCP_CACHED_RESOURCES", DEFAULT_RESOURCES)) if resources is None else resources
+        )
+        self.mutating = (
+            _names(os.environ.get("MCP_MUTATING_TOOLS", DEFAULT_MUTATING)) if mutating is None else mutating
+        )
+        self.corpus_tools = (
+            _names(os.environ.get("MCP_CORPUS_TOOLS", DEFAULT_CORPUS_TOOLS)) if corpus_tools is None else corpus_tools
+        )
+        self.ttl = float(os.environ.get("MCP_TOOL_CACHE_TTL", DEFAULT_TTL)) if ttl is None else ttl
+        self.max_entries = (
+            int(os.environ.get("MCP_TOOL_CACHE_SIZE", DEFAULT_SIZE)) if max_entries is None else max_entries
+        )
+
+        self.prefetch_tool = (
+            os.environ.get("MCP_PREFETCH_TOOL", DEFAULT_PREFETCH_TOOL) if prefetch_tool is None else prefetch_tool
+        ).strip()
+        self.prefetch_max = (
+            int(os.environ.get("MCP_PREFETCH_MAX", DEFAULT_PREFETCH_MAX)) if prefetch_max is None else prefetch_max
+        )
+
+        # (server, tool, arguments) -> (stored_at, tags, result)
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Set[str], Any]]" = OrderedDict()
+        # Prefetches in flight, and prefetched entries not used yet
+        self._pending: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self._prefetched: Set[Tuple[str, str, str]] = set()
+        self._prefetch_slots = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "prefetched": 0,
+            "prefetch_hits": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def caches_tool(self, tool_name: str) -> bool:
+        return self.enabled and tool_name in self.tools
+
+    def caches_resource(self, uri: str) -> bool:
+        return self.enabled and any(uri.startswith(prefix) for prefix in self.resources)
+
+    def tool_tags(self, tool_name: str, arguments: Optional[dict]) -> Set[str]:
+        """Tags of a call: those of its arguments, plus the corpus for corpus-wide tools."""
+        tags = argument_tags(arguments)
+        if tool_name in self.corpus_tools:
+            tags.add(CORPUS)
+        return tags
+
+    def __contains__(self, key: Tuple[str, str, str]) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Any]:
+        """Return the cached result for `key`, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            self.counters["expired"] += 1
+            entry = None
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.counters["hits"] += 1
+        if key in self._prefetched:
+            self._prefetched.discard(key)
+            self.counters["prefetch_hits"] += 1
+        return entry[2]
+
+    async def wait_prefetch(self, key: Tuple[str, str, str]) -> Optional[Any]:
+        """Result of the prefetch of `key` still in flight, or None if there is none (or it failed)."""
+        task = self._pending.get(key)
+        if task is None:
+            return None
+        # shield: a cancelled caller must not cancel the prefetch
+        result = await asyncio.shield(task)
+        if result is not None:
+            self._prefetched.discard(key)
+            self.counters["prefetch_hits"] += 1
+        return result
+
+    def prefetch(self, key: Tuple[str, str, str], tags: Set[str], call: Any) -> None:
+        """Run `call()` in the background unless `key` is cached or already in flight; cache its result."""
+        if key in self or key in self._pending:
+            return
+
+        async def run() -> Optional[Any]:
+            try:
+                async with self._prefetch_slots:
+                    result = await call()
+            except Exception as e:
+                print(f"Error prefetching {key[1]} {key[2]}: {e}")
+                return None
+            if getattr(result, "isError", False):
+                return None
+            self.put(key, tags, result)
+            self._prefetched.add(key)
+            return result
+
+        task = asyncio.create_task(run())
+        self._pending[key] = task
+        task.add_done_callback(lambda _: self._pending.pop(key, None))
+        self.counters["prefetched"] += 1
+
+    def cancel_prefetches(self) -> None:
+        for task in list(self._pending.values()):
+            task.cancel()
+
+    def put(self, key: Tuple[str, str, str], tags: Set[str], result: Any) -> None:
+        if getattr(result, "isError", False):
+            return
+        self._entries[key] = (time.monotonic(), tags, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def invalidate(self, tags: Set[str]) -> int:
+        """Drop the entries depending on any of `tags`; returns how many were dropped."""
+        stale = [key for key, (_, entry_tags, _) in self._entries.items() if entry_tags & tags]
+        for key in stale:
+            del self._entries[key]
+            self._prefetched.discard(key)
+        self.counters["invalidations"] += len(stale)
+        return len(stale)
+
+    def after_mutation(self, arguments: Optional[dict], result: Any) -> None:
+        """Invalidate what a successful mutating call touched: topics, returned paper IDs, corpus."""
+        if getattr(result, "isError", False):
+            return
+        tags = argument_tags(arguments) | {CORPUS}
+        tags.update(f"paper:{value}" for value in result_strings(result))
+        self.invalidate(tags)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "entries": len(self._entries)}
+
+
+class CachedSession:
+    """
+    Wraps the session of one server: cached tools and resources are answered
+    from the ToolCache, mutating tools invalidate it, everything else goes
+    straight to the server.
+    """
+
+    def __init__(self, session: Any, server_name: str, cache: ToolCache):
+        self.session = session
+        self.server_name = server_name
+        self.cache = cache
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None) -> Any:
+        if not self.cache.caches_tool(name):
+            result = await self.session.call_tool(name, arguments=arguments)
+            if name in self.cache.mutating and not getattr(result, "isError", False):
+                self.cache.after_mutation(arguments, result)
+                self.prefetch(result_strings(result))
+            return result
+
+        key = (self.server_name, name, canonical_arguments(arguments))
+        result = self.cache.get(key)
+        if result is None:
+            result = await self.cache.wait_prefetch(key)
+        if result is None:
+            result = await self.session.call_tool(name, arguments=arguments)
+            self.cache.put(key, self.cache.tool_tags(name, arguments), result)
+        return result
+
+    def prefetch(self, paper_ids: List[str]) -> None:
+        """Start the prefetch tool (extract_info) for paper IDs the model is likely to ask about."""
+        tool = self.cache.prefetch_tool
+        if not tool or not self.cache.caches_tool(tool):
+            return
+        # Error messages of a batch search are mixed with the IDs; an ID has no spaces
+        paper_ids = [paper_id for paper_id in paper_ids if paper_id and not any(c.isspace() for c in paper_id)]
+        for paper_id in paper_ids[: self.cache.prefetch_max]:
+            arguments = {"paper_id": paper_id}
+            self.cache.prefetch(
+                (self.server_name, tool, canonical_arguments(arguments)),
+                self.cache.tool_tags(tool, arguments),
+                lambda arguments=arguments: self.session.call_tool(tool, arguments=arguments),
+            )
+
+    async def read_resource(self, uri: Any) -> Any:
+        uri_text = str(uri)
+        if not self.cache.caches_resource(uri_text):
+            return await self.session.read_resource(uri=uri)
+
+        key = (self.server_name, "read_resource", uri_text)
+        result = self.cache.get(key)
+        if result is None:
+            result = await self.session.read_resource(uri=uri)
+            self.cache.put(key, resource_tags(uri_text), result)
+        return result
+
+    async def get_prompt(self, name: str, arguments: Optional[dict] = None) -> Any:
+        return await self.session.get_prompt(name, arguments=arguments)
+
+    async def close(self) -> None:
+        await self.session.close()
@@ -0,0 +1,89 @@
+"""
+Concurrent execution of the tool_use blocks of one model turn.
+
+When the model asks for several tools in the same response (e.g. five
+extract_info calls), the calls are sent together instead of one after the
+other: a turn takes the time of its slowest call. Each MCP session runs at
+most MCP_MAX_CALLS_PER_SESSION calls at a time, so a single stdio server is
+not flooded. The tool_result blocks come back in the order of the tool_use
+blocks, ready to be sent as one user message. With a streamed response, each
+call can also be started (start) as soon as its tool_use block is complete.
+"""
+
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp import ClientSession
+
+
+MAX_CALLS_PER_SESSION = int(os.environ.get("MCP_MAX_CALLS_PER_SESSION", "4"))
+
+
+class ToolDispatcher:
+    def __init__(self, max_calls_per_session: int = MAX_CALLS_PER_SESSION):
+        self.max_calls_per_session = max_calls_per_session
+        # id(session) -> semaphore bounding the calls in flight on that session
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    def _semaphore(self, session: ClientSession) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(id(session))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_calls_per_session)
+            self._semaphores[id(session)] = semaphore
+        return semaphore
+
+    async def call_tool(self, session: Optional[ClientSession], tool_use: Any) -> Dict[str, Any]:
+        """Run one tool_use block and return its tool_result block."""
+        if session is None:
+            print(f"Tool '{tool_use.name}' not found.")
+            return {
+                "type": "tool_result",
+                "tool_use_id": tool_use.id,
+                "content": f"Tool '{tool_use.name}' not found.",
+                "is_error": True,
+            }
+
+        print(f"Calling tool {tool_use.name} with args {tool_use.input}")
+        try:
+            async with self._semaphore(session):
+                result = await session.call_tool(tool_use.name, arguments=tool_use.input)
+        except Exception as e:
+            # The model gets the error instead of the whole turn failing
+            print(f"Error calling tool {tool_use.name}: {e}")
+            return {
+                "type": "tool_result",
+                "tool_use_id": tool_use.id,
+                "content": f"Error calling tool {tool_use.name}: {e}",
+                "is_error": True,
+            }
+
+        tool_result = {
+            "type": "tool_result",
+            "tool_use_id": tool_use.id,
+            "content": result.content,
+        }
+        if getattr(result, "isError", False):
+            tool_result["is_error"] = True
+        return tool_result
+
+    def start(
+        self, tool_use: Any, session_for: Callable[[str], Optional[ClientSession]]
+    ) -> "asyncio.Task[Dict[str, Any]]":
+        """Start one tool_use block in the background; the task returns its tool_result block."""
+        return asyncio.create_task(self.call_tool(session_for(tool_use.name), tool_use))
+
+    async def run_turn(
+        self, tool_uses: List[Any], session_for: Callable[[str], Optional[ClientSession]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run every tool_use block of a turn concurrently.
+
+        Args:
+            tool_uses: The tool_use blocks of the model response, in order
+            session_for: Returns the session serving a tool name (or None)
+
+        Returns:
+            The tool_result blocks, in the same order as `tool_uses`
+        """
+        return list(await asyncio.gather(*(self.start(tool_use, session_for) for tool_use in tool_uses)))
@@ -2,39 +2,43 @@
 # research_core.py
 from __future__ import annotations
 
-import json
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Dict
 
 import arxiv
 
+from servers.arxiv_client import get_arxiv_client
+from servers.paper_store import PaperStore, open_store
+
 
 # ---------- utils ----------
-def _safe_id(pid: str) -> str:
+@lru_cache(maxsize=None)
+def _default_store(base_dir: str) -> PaperStore:
     """
-    Transforme un ID arXiv en nom de fichier sûr.
-    Exemple: 'gr-qc/0612006v1' -> 'gr-qc_0612006v1'
+    Store partagé par base_dir (papers/papers.db par défaut) : chaque papier y est
+    stocké une seule fois, quel que soit le nombre de topics qui l’ont trouvé.
     """
-    return (
-        pid.replace("/", "_")
-        .replace("\\", "_")
-        .replace(":", "-")
-        .strip()
-    )
+    return open_store(base_dir)
 
 
 # ---------- API principale (utilisable sans MCP) ----------
-def search_papers(topic: str, max_results: int = 5, base_dir: str | Path = "papers") -> List[str]:
+def search_papers(
+    topic: str,
+    max_results: int = 5,
+    base_dir: str | Path = "papers",
+    store: Optional[PaperStore] = None,
+) -> List[str]:
     """
-    Recherche des papiers sur arXiv, stocke leur meta en JSON (et un .txt du résumé),
-    et retourne la liste des paper_ids arXiv (non ‘safe’, c.-à-d. l’ID d’origine).
+    Recherche des papiers sur arXiv, stocke leurs métadonnées dans le store
+    (cf. servers/paper_store.py) et retourne la liste des paper_ids arXiv.
 
-    Dossiers créés: papers/<topic>/
-    Fichiers: <safe_id>.json, <safe_id>.txt
+    Sans `store`, celui de `base_dir` est utilisé. Les anciens fichiers par papier
+    (papers/<topic>/<id>.json + .txt) ne sont plus écrits : servers/migrate_papers.py
+    les importe dans le store.
     """
-    base = Path(base_dir)
-    topic_dir = base / topic
-    topic_dir.mkdir(parents=True, exist_ok=True)
+    if store is None:
+        store = _default_store(str(base_dir))
 
     search = arxiv.Search(
         query=topic,
@@ -43,8 +47,10 @@ def search_papers(topic: str, max_results: int = 5, base_dir: str | Path = "pape
     )
 
     results: List[str] = []
+    stored: Dict[str, Dict] = {}
 
-    for paper in search.results():
+    # Client partagé (connexions keep-alive + limite de débit arXiv)
+    for paper in get_arxiv_client().results(search):
         # Champs utiles
         paper_id = paper.get_short_id()  # ex: '2508.12345v1' ou 'gr-qc/0612006v1'
         title = paper.title or ""
@@ -53,9 +59,7 @@ def search_papers(topic: str, max_results: int = 5, base_dir: str | Path = "pape
         published = paper.published.isoformat() if getattr(paper, "published", None) else None
         url = paper.entry_id or ""
 
-        # Ecriture sur disque (safe filename)
-        safe_id = _safe_id(paper_id)
-        data: Dict[str, object] = {
+        stored[paper_id] = {
             "paper_id": paper_id,  # on garde l'ID original pour retrouver l’article
             "title": title,
             "summary": summary,
@@ -64,43 +68,27 @@ def search_papers(topic: str, max_results: int = 5, base_dir: str | Path = "pape
             "url": url,
             "topic": topic,
         }
-
-        (topic_dir / f"{safe_id}.json").write_text(
-            json.dumps(data, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-
-        # Optionnel: résumé brut pour consultation rapide
-        (topic_dir / f"{safe_id}.txt").write_text(summary, encoding="utf-8")
-
         results.append(paper_id)
 
+    # Une seule écriture groupée pour tous les nouveaux papiers
+    store.add_papers(topic, stored)
+
     return results
 
 
-def extract_info(paper_id: str, base_dir: str | Path = "papers") -> Optional[Dict]:
+def extract_info(
+    paper_id: str,
+    base_dir: str | Path = "papers",
+    store: Optional[PaperStore] = None,
+) -> Optional[Dict]:
     """
-    Retrouve l’info JSON d’un paper_id (ID d’origine arXiv), en scannant tous les topics.
+    Retrouve l’info JSON d’un paper_id (ID d’origine arXiv) : une lecture indexée
+    dans le store, où chaque papier n’existe qu’une fois.
     Retourne le dict si trouvé, sinon None.
     """
-    base = Path(base_dir)
-    if not base.exists():
-        return None
-
-    safe = _safe_id(paper_id)
-
-    # On cherche dans papers/*/<safe_id>.json
-    for json_path in base.glob(f"*/{safe}.json"):
-        try:
-            data = json.loads(json_path.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-
-        # Par sécurité, on vérifie qu'on retombe bien sur le paper_id recherché
-        if isinstance(data, dict) and data.get("paper_id") == paper_id:
-            return data
-
-    return None
+    if store is None:
+        store = _default_store(str(base_dir))
+    return store.get_paper(paper_id)
 
 
 __all__ = ["search_papers", "extract_info"]
@@ -3,21 +3,21 @@ from __future__ import annotations
 
 from pathlib import Path
 from typing import Any, Dict, List
-import os, json
+import os
 
 import gradio as gr
 import arxiv
 
+from servers.arxiv_client import get_arxiv_client
+from servers.paper_store import open_store
+
 
 # Où stocker les fichiers (sur Spaces, /tmp est sûr en écriture)
 PAPERS_DIR = Path(os.environ.get("PAPERS_DIR", "/tmp/papers"))
 PAPERS_DIR.mkdir(parents=True, exist_ok=True)
 
-
-def _ensure_topic_dir(topic: str) -> Path:
-    d = PAPERS_DIR / topic
-    d.mkdir(parents=True, exist_ok=True)
-    return d
+# Un seul exemplaire de chaque papier, les topics n'en gardent que la liste
+store = open_store(str(PAPERS_DIR))
 
 
 def search_papers(topic: str, max_results: int = 5) -> List[str]:
@@ -35,15 +35,14 @@ def search_papers(topic: str, max_results: int = 5) -> List[str]:
     if not topic:
         return []
 
-    topic_dir = _ensure_topic_dir(topic)
-
     search = arxiv.Search(
         query=topic,
         max_results=int(max_results),
         sort_by=arxiv.SortCriterion.Relevance,
     )
-    client = arxiv.Client()
+    client = get_arxiv_client()
     ids: List[str] = []
+    papers: Dict[str, Dict[str, Any]] = {}
 
     for r in client.results(search):
         paper_id = r.get_short_id()
@@ -57,13 +56,9 @@ def search_papers(topic: str, max_results: int = 5) -> List[str]:
             "summary": r.summary,
             "topic": topic,
         }
-        (topic_dir / f"{paper_id}.json").write_text(
-            json.dumps(meta, ensure_ascii=False, indent=2)
-        )
-        (topic_dir / f"{paper_id}.txt").write_text(
-            f"{meta['title']}\n{', '.join(meta['authors'])}\n{meta['url']}\n\n{meta['summary']}"
-        )
+        papers[paper_id] = meta
 
+    store.add_papers(topic, papers)
     return ids
 
 
@@ -78,10 +73,9 @@ def extract_info(paper_id: str) -> Dict[str, Any]:
         Dict[str, Any]: Paper info if found, or {"error": "..."} if not found.
     """
     pid = paper_id.strip()
-    for topic_dir in PAPERS_DIR.glob("*"):
-        cand = topic_dir / f"{pid}.json"
-        if cand.exists():
-            return json.loads(cand.read_text())
+    info = store.get_paper(pid)
+    if info is not None:
+        return info
     return {"error": f"Paper {pid} not found in {PAPERS_DIR}."}
 
 
@@ -0,0 +1,162 @@
+"""
+Process-wide arXiv client shared by every search_papers implementation.
+
+Building a fresh arxiv.Client() per call throws away its HTTP session
+(keep-alive connections) and its rate-limit state. Here a single client is
+created lazily and reused: its requests session keeps a pool of keep-alive
+connections, and all requests of the process, from any thread, go through one
+RateLimiter that spaces them as arXiv asks (one request every 3 seconds).
+
+Configuration (environment variables):
+  ARXIV_PAGE_SIZE      results fetched per API request (default: 100)
+  ARXIV_NUM_RETRIES    retries of a failed page (default: 3)
+  ARXIV_DELAY_SECONDS  minimum spacing between two requests (default: 3.0)
+  ARXIV_POOL_SIZE      keep-alive connections kept in the pool (default: 4)
+"""
+
+import os
+import threading
+import time
+from typing import Container, Dict, Optional
+
+import arxiv
+
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_NUM_RETRIES = 3
+DEFAULT_DELAY_SECONDS = 3.0
+DEFAULT_POOL_SIZE = 4
+
+
+class RateLimiter:
+    """Thread-safe minimum spacing between two calls of wait()."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        # Reserve the next free slot under the lock, sleep outside of it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RateLimitedClient(arxiv.Client):
+    """
+    arxiv.Client whose page requests (retries included) all wait on a shared
+    RateLimiter instead of the per-client delay_seconds bookkeeping.
+    """
+
+    def __init__(self, limiter: RateLimiter, page_size: int, num_retries: int, pool_size: int):
+        super().__init__(page_size=page_size, delay_seconds=0.0, num_retries=num_retries)
+        self.limiter = limiter
+
+        session = getattr(self, "_session", None)
+        if session is not None:
+            from requests.adapters import HTTPAdapter
+
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+    def _parse_feed(self, url, first_page=True, _try_index=0):
+        self.limiter.wait()
+        return super()._parse_feed(url, first_page=first_page, _try_index=_try_index)
+
+
+_client: Optional[arxiv.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_arxiv_client() -> arxiv.Client:
+    """Return the process-wide arXiv client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            limiter = RateLimiter(float(os.environ.get("ARXIV_DELAY_SECONDS", DEFAULT_DELAY_SECONDS)))
+            page_size = int(os.environ.get("ARXIV_PAGE_SIZE", DEFAULT_PAGE_SIZE))
+            num_retries = int(os.environ.get("ARXIV_NUM_RETRIES", DEFAULT_NUM_RETRIES))
+            pool_size = int(os.environ.get("ARXIV_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+            if hasattr(arxiv.Client, "_parse_feed"):
+                _client = RateLimitedClient(limiter, page_size, num_retries, pool_size)
+            else:
+                # Unknown arxiv version: keep the library's own request spacing
+                _client = arxiv.Client(
+                    page_size=page_size,
+                    delay_seconds=limiter.min_interval,
+                    num_retries=num_retries,
+                )
+        return _client
+
+
+def paper_to_info(paper: arxiv.Result) -> dict:
+    """Metadata stored for each paper by the research servers."""
+    return {
+        "title": paper.title,
+        "authors": [author.name for author in paper.authors],
+        "summary": paper.summary,
+        "pdf_url": paper.pdf_url,
+        "published": str(paper.published.date()),
+    }
+
+
+def search_arxiv(
+    topic: str,
+    max_results: int,
+    sort_by: arxiv.SortCriterion = arxiv.SortCriterion.Relevance,
+) -> Dict[str, dict]:
+    """
+    Query arXiv with the shared client.
+
+    Returns:
+        {paper_id: info} in arXiv's result order
+    """
+    search = arxiv.Search(query=topic, max_results=max_results, sort_by=sort_by)
+    return {
+        paper.get_short_id(): paper_to_info(paper)
+        for paper in get_arxiv_client().results(search)
+    }
+
+
+def search_arxiv_since(
+    topic: str,
+    since: Optional[str],
+    known_ids: Container[str],
+    max_results: int,
+) -> Dict[str, dict]:
+    """
+    Newest papers on a topic, walking arXiv by submission date (newest first)
+    and stopping as soon as the results get older than `since`, so that only
+    the pages holding new papers are fetched.
+
+    Args:
+        topic: The topic to search for
+        since: Newest publication date already stored (YYYY-MM-DD), None for no limit
+        known_ids: Paper IDs already stored, skipped (same-day papers)
+        max_results: Upper bound on the number of results walked
+
+    Returns:
+        {paper_id: info} of the papers not stored yet, newest first
+    """
+    search = arxiv.Search(
+        query=topic,
+        max_results=max_results,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Descending,
+    )
+    new_papers = {}
+    for paper in get_arxiv_client().results(search):
+        info = paper_to_info(paper)
+        if since is not None and info["published"] < since:
+            # Everything after this one is older: stop paging
+            break
+        paper_id = paper.get_short_id()
+        if paper_id not in known_ids:
+            new_papers[paper_id] = info
+    return new_papers
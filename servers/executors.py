@@ -0,0 +1,42 @@
+"""
+Bounded thread pools used by the async tools of the research servers.
+
+FastMCP runs tools on its event loop: a blocking arXiv query inside a tool
+stalls every other client. The tools therefore await their blocking work in
+one of two pools:
+  - the search pool, for arXiv queries and the store writes that follow them
+  - the read pool, for store reads (extract_info, papers:// resources)
+Keeping them separate means in-flight searches can never starve the reads.
+
+Configuration (environment variables):
+  MCP_SEARCH_THREADS  size of the search pool (default: 4)
+  MCP_READ_THREADS    size of the read pool (default: 8)
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+search_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("MCP_SEARCH_THREADS", "4")),
+    thread_name_prefix="research-search",
+)
+read_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("MCP_READ_THREADS", "8")),
+    thread_name_prefix="research-read",
+)
+
+
+async def run_search(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking network/write work in the search pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(search_pool, functools.partial(fn, *args, **kwargs))
+
+
+async def run_read(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking store read in the read pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(read_pool, functools.partial(fn, *args, **kwargs))
@@ -0,0 +1,126 @@
+"""
+Local full-text search over the stored papers (BM25 ranking).
+
+An inverted index of the tokenized titles, summaries and authors is built from
+the paper store on first use, then kept up to date by subscribing to the
+store's writes, so most lookups are answered without any network call.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List
+
+from paper_store import PaperStore
+
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to we with".split()
+)
+# A match in the title counts as much as TITLE_WEIGHT matches in the summary
+TITLE_WEIGHT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token for token in _TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in _STOPWORDS
+    ]
+
+
+def paper_terms(info: dict) -> Counter:
+    """Term frequencies of a paper (title weighted, summary, authors)."""
+    terms = Counter(tokenize(info.get("summary") or ""))
+    for token in tokenize(info.get("title") or ""):
+        terms[token] += TITLE_WEIGHT
+    terms.update(tokenize(" ".join(info.get("authors") or [])))
+    return terms
+
+
+class BM25Index:
+    def __init__(self, store: PaperStore, k1: float = 1.2, b: float = 0.75):
+        self.store = store
+        self.k1 = k1
+        self.b = b
+        # term -> {paper_id: term frequency}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        # paper_id -> its distinct terms, to unindex a paper that is stored again
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.titles: Dict[str, str] = {}
+        self.total_len = 0
+        self._built = False
+        self._lock = threading.RLock()
+        store.subscribe(self.on_papers_added)
+
+    def _remove(self, paper_id: str) -> None:
+        if paper_id not in self.doc_len:
+            return
+        for term in self.doc_terms.pop(paper_id):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(paper_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(paper_id)
+        self.titles.pop(paper_id, None)
+
+    def add(self, paper_id: str, info: dict) -> None:
+        with self._lock:
+            self._remove(paper_id)
+            terms = paper_terms(info)
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[paper_id] = tf
+            self.doc_len[paper_id] = sum(terms.values())
+            self.total_len += self.doc_len[paper_id]
+            self.doc_terms[paper_id] = list(terms)
+            self.titles[paper_id] = info.get("title") or ""
+
+    def on_papers_added(self, topic: str, papers: Dict[str, dict]) -> None:
+        with self._lock:
+            # Before the first build the store itself is the source of truth
+            if not self._built:
+                return
+            for paper_id, info in papers.items():
+                self.add(paper_id, info)
+
+    def build(self) -> None:
+        """Index every stored paper (done once, on first search)."""
+        with self._lock:
+            if self._built:
+                return
+            for topic in self.store.list_topics():
+                try:
+                    for paper_id, info in self.store.iter_topic_papers(topic):
+                        self.add(paper_id, info)
+                except ValueError as e:
+                    print(f"Error indexing topic {topic}: {str(e)}")
+            self._built = True
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Return the `k` best papers for `query` as [{paper_id, title, score}]."""
+        self.build()
+        with self._lock:
+            n_docs = len(self.doc_len)
+            if not n_docs:
+                return []
+            avg_len = self.total_len / n_docs
+
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for paper_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_len[paper_id] / avg_len)
+                    scores[paper_id] = scores.get(paper_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [
+                {"paper_id": paper_id, "title": self.titles[paper_id], "score": round(score, 3)}
+                for paper_id, score in best
+            ]
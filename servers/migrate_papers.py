@@ -0,0 +1,103 @@
+"""
+Migration of the topic folders into the deduplicated SQLite store.
+
+Every folder of papers/ (papers_info.json snapshots, papers_info.jsonl
+segments, per-paper <id>.json / <id>.txt files) is streamed into
+papers/papers.db, where each paper is stored once and topics only hold
+membership rows. Papers already in the database keep their current body.
+
+    uv run servers/migrate_papers.py [--remove]
+
+--remove deletes the migrated files (and the emptied folders) afterwards.
+"""
+
+import os
+import sys
+import time
+from typing import List
+
+from paper_store import (
+    DB_FILE,
+    MIGRATION_DONE,
+    PAPER_DIR,
+    TOPIC_FILES,
+    PaperLocationIndex,
+    SqlitePaperStore,
+    folder_topics,
+    migrate_topic,
+    paper_files,
+)
+
+
+def _disk_usage(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _migrated_files(topic_path: str) -> List[str]:
+    files = [os.path.join(topic_path, name) for name in TOPIC_FILES]
+    for json_path in paper_files(topic_path):
+        # research_core.py wrote the summary next to the JSON file
+        files.extend([json_path, json_path[: -len(".json")] + ".txt"])
+    return [file_path for file_path in files if os.path.isfile(file_path)]
+
+
+def _remove_topic(topic_path: str) -> None:
+    for file_path in _migrated_files(topic_path):
+        os.remove(file_path)
+    try:
+        os.rmdir(topic_path)
+    except OSError:
+        # Something else than papers lives in the folder: keep it
+        pass
+
+
+if __name__ == "__main__":
+    remove = "--remove" in sys.argv[1:]
+    folders_size = sum(
+        os.path.getsize(file_path)
+        for topic in folder_topics(PAPER_DIR)
+        for file_path in _migrated_files(os.path.join(PAPER_DIR, topic))
+    )
+
+    store = SqlitePaperStore(os.path.join(PAPER_DIR, DB_FILE))
+    try:
+        records = 0
+        failed = False
+        for topic in folder_topics(PAPER_DIR):
+            try:
+                count = migrate_topic(PAPER_DIR, topic, store)
+            except (OSError, ValueError) as e:
+                failed = True
+                print(f"{topic}: error {str(e)}")
+                continue
+            records += count
+            print(f"{topic}: {count} papers")
+            if remove:
+                _remove_topic(os.path.join(PAPER_DIR, topic))
+        if not failed:
+            # The servers no longer look at the folders when they start
+            store.set_meta(MIGRATION_DONE, str(time.time()))
+        papers = store.count_papers()
+    finally:
+        store.close()
+
+    if remove:
+        # The location index of the json backend points to the removed files
+        index_path = os.path.join(PAPER_DIR, PaperLocationIndex.INDEX_FILE)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    db_size = _disk_usage(PAPER_DIR) if remove else sum(
+        os.path.getsize(os.path.join(PAPER_DIR, name))
+        for name in os.listdir(PAPER_DIR)
+        if name.startswith(DB_FILE)
+    )
+    print(f"\n{records} records read, {papers} distinct papers in {os.path.join(PAPER_DIR, DB_FILE)}")
+    print(f"Topic folders: {folders_size / 1024:.0f} KiB -> database: {db_size / 1024:.0f} KiB")
@@ -0,0 +1,99 @@
+"""
+Serialization of tool results, to keep the tokens sent back to the model low.
+
+Three formats are available:
+  - "pretty":  indented JSON (the historical output of extract_info)
+  - "compact": JSON without indentation nor spaces after separators (default)
+  - "minimal": compact JSON with short key names (see SHORT_KEYS)
+
+Summaries can also be truncated to a number of characters. The defaults come
+from MCP_OUTPUT_FORMAT and MCP_SUMMARY_CHARS (0 keeps the full summary); the
+paper tools accept both options per call.
+
+Short keys and truncation only apply to the fields of paper records, never to
+data keys: the layout of the value tells where the records are (one record, a
+list of records, a map of records by ID, or no record at all).
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+
+FORMATS = ("pretty", "compact", "minimal")
+DEFAULT_FORMAT = os.environ.get("MCP_OUTPUT_FORMAT", "compact")
+DEFAULT_SUMMARY_CHARS = int(os.environ.get("MCP_SUMMARY_CHARS", "0"))
+
+# Where the paper records are in a value passed to dump()
+RECORD = "record"
+RECORDS = "records"
+RECORD_MAP = "record_map"
+PLAIN = "plain"
+
+SHORT_KEYS = {
+    "paper_id": "id",
+    "title": "t",
+    "authors": "a",
+    "summary": "s",
+    "pdf_url": "u",
+    # arXiv page, stored by research_core.py and research_server_HF.py
+    "url": "l",
+    "published": "p",
+    "score": "sc",
+}
+
+
+def _check_short_keys() -> None:
+    # Two fields sharing a key (or a short key equal to another field's name)
+    # would overwrite each other in a record
+    short = list(SHORT_KEYS.values())
+    clashes = {key for key in short if short.count(key) > 1} | (set(short) & set(SHORT_KEYS))
+    if clashes:
+        raise ValueError(f"SHORT_KEYS maps several fields to the same key: {', '.join(sorted(clashes))}")
+
+
+_check_short_keys()
+
+
+def _shape_record(record: Any, minimal: bool, summary_chars: int) -> Any:
+    if not isinstance(record, dict):
+        return record
+    shaped = {}
+    for key, item in record.items():
+        if key == "summary" and summary_chars > 0 and isinstance(item, str) and len(item) > summary_chars:
+            item = item[:summary_chars].rstrip() + "..."
+        shaped[SHORT_KEYS.get(key, key) if minimal else key] = item
+    return shaped
+
+
+def _shape(value: Any, layout: str, minimal: bool, summary_chars: int) -> Any:
+    if layout == RECORD:
+        return _shape_record(value, minimal, summary_chars)
+    if layout == RECORDS and isinstance(value, list):
+        return [_shape_record(item, minimal, summary_chars) for item in value]
+    if layout == RECORD_MAP and isinstance(value, dict):
+        return {key: _shape_record(item, minimal, summary_chars) for key, item in value.items()}
+    return value
+
+
+def dump(
+    value: Any,
+    output_format: Optional[str] = None,
+    summary_chars: Optional[int] = None,
+    layout: str = RECORD,
+) -> str:
+    """
+    Serialize a tool result in `output_format`, truncating summaries to
+    `summary_chars`. `layout` (RECORD, RECORDS, RECORD_MAP or PLAIN) tells
+    where the paper records are in `value`.
+    """
+    output_format = (output_format or DEFAULT_FORMAT).lower()
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown output format: {output_format!r} (expected one of {', '.join(FORMATS)})")
+    if summary_chars is None:
+        summary_chars = DEFAULT_SUMMARY_CHARS
+
+    value = _shape(value, layout, output_format == "minimal", summary_chars)
+    if output_format == "pretty":
+        return json.dumps(value, indent=2)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
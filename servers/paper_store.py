@@ -0,0 +1,987 @@
+"""
+Pluggable storage for paper metadata, shared by the research servers and
+research_core.py.
+
+Two backends are available:
+  - "sqlite": a single papers/papers.db database (WAL mode) where each paper is
+              stored once under its paper_id and topics only hold rows of a
+              topic_membership table, so a paper found by several topics is
+              not duplicated, lookups are O(log n) and inserts only touch the
+              new rows (default)
+  - "json":   one papers/<topic>/ folder per topic, holding the historical
+              papers_info.json as a snapshot plus an append-only
+              papers_info.jsonl segment
+
+The backend is chosen with the PAPER_STORE_BACKEND environment variable. When
+papers/papers.db does not exist yet, the topic folders found in papers/ are
+migrated into it (see migrate_folders and servers/migrate_papers.py).
+"""
+
+import itertools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+PAPER_DIR = "papers"
+DEFAULT_BACKEND = "sqlite"
+DB_FILE = "papers.db"
+
+# Files of a topic folder for the json backend. Later files override earlier
+# ones: the snapshot, a segment being compacted, then the live segment.
+SNAPSHOT_FILE = "papers_info.json"
+LOG_FILE = "papers_info.jsonl"
+COMPACTING_FILE = LOG_FILE + ".compacting"
+TOPIC_FILES = (SNAPSHOT_FILE, COMPACTING_FILE, LOG_FILE)
+
+DEFAULT_COMPACT_BYTES = 256 * 1024
+
+# Papers written per transaction when migrating topic folders
+MIGRATION_BATCH = 500
+# meta key set once every topic folder made it into the SQLite store
+MIGRATION_DONE = "folders_migrated"
+# meta key counting the write transactions of every process (see catalog_version)
+CATALOG_WRITES = "catalog_writes"
+
+
+def topic_key(topic: str) -> str:
+    """Normalize a topic into its folder / membership name."""
+    return topic.lower().replace(" ", "_")
+
+
+class PaperStore:
+    """Interface shared by all storage backends."""
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, Dict[str, dict]], None]] = []
+
+    def subscribe(self, listener: Callable[[str, Dict[str, dict]], None]) -> None:
+        """Call `listener(topic, papers)` after every successful add_papers."""
+        self._listeners.append(listener)
+
+    def _notify(self, topic: str, papers: Dict[str, dict]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(topic_key(topic), papers)
+            except Exception as e:
+                print(f"Error in paper store listener: {str(e)}")
+
+    def add_papers(self, topic: str, papers: Dict[str, dict]) -> None:
+        """Store (or update) papers and record them as members of `topic`."""
+        raise NotImplementedError
+
+    def add_papers_by_topic(self, papers_by_topic: Dict[str, Dict[str, dict]]) -> None:
+        """Store the results of several topics at once ({topic: {paper_id: info}})."""
+        for topic, papers in papers_by_topic.items():
+            self.add_papers(topic, papers)
+
+    def get_paper(self, paper_id: str) -> Optional[dict]:
+        """Return the stored info for `paper_id`, or None if unknown."""
+        raise NotImplementedError
+
+    def get_papers(self, paper_ids: List[str]) -> Dict[str, dict]:
+        """Return {paper_id: info} for the known IDs among `paper_ids`."""
+        papers = {}
+        for paper_id in paper_ids:
+            info = self.get_paper(paper_id)
+            if info is not None:
+                papers[paper_id] = info
+        return papers
+
+    def iter_topic_papers(self, topic: str) -> Iterator[Tuple[str, dict]]:
+        """Stream (paper_id, info) for a topic, in insertion order."""
+        raise NotImplementedError
+
+    def get_topic_papers(self, topic: str) -> Optional[Dict[str, dict]]:
+        """Return {paper_id: info} for a topic, or None if the topic does not exist."""
+        raise NotImplementedError
+
+    def iter_topic_page(self, topic: str, offset: int, limit: int) -> Iterator[Tuple[str, dict]]:
+        """Stream at most `limit` papers of a topic, starting at position `offset`."""
+        return itertools.islice(self.iter_topic_papers(topic), offset, offset + limit)
+
+    def count_topic_papers(self, topic: str) -> int:
+        return sum(1 for _ in self.iter_topic_papers(topic))
+
+    def topic_version(self, topic: str) -> Hashable:
+        """
+        Cheap token that changes whenever the papers of a topic change, including
+        writes made by another process (used to invalidate rendered pages).
+        """
+        raise NotImplementedError
+
+    def latest_published(self, topic: str) -> Optional[str]:
+        """Newest publication date (YYYY-MM-DD) among the papers of a topic."""
+        dates = [
+            str(info["published"])[:10]
+            for _, info in self.iter_topic_papers(topic)
+            if info.get("published")
+        ]
+        return max(dates, default=None)
+
+    def list_topics(self) -> List[str]:
+        """Return the names of all topics that hold papers."""
+        raise NotImplementedError
+
+    def topic_stats(self) -> Dict[str, Tuple[int, float]]:
+        """{topic: (number of papers, last update timestamp)} for every topic."""
+        raise NotImplementedError
+
+    def catalog_version(self) -> Hashable:
+        """
+        Cheap token that changes when topics may have been added or written by
+        another process (a few stat() calls or one row, no listing).
+        """
+        raise NotImplementedError
+
+    def location(self, topic: str) -> str:
+        """Human readable location of a topic, used in server logs."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def scan_offsets(raw: bytes) -> Dict[str, Tuple[int, int]]:
+    """
+    Return {paper_id: (byte offset, byte length)} of every value of a
+    papers_info.json document.
+
+    The bytes are decoded as latin-1 so that one character is one byte and
+    the decoder positions are byte offsets; keys are re-decoded as UTF-8.
+    """
+    text = raw.decode("latin-1")
+    decoder = json.JSONDecoder()
+    offsets: Dict[str, Tuple[int, int]] = {}
+
+    pos = _WHITESPACE.match(text, 0).end()
+    if text[pos:pos + 1] != "{":
+        raise ValueError("papers_info.json must hold a JSON object")
+    pos = _WHITESPACE.match(text, pos + 1).end()
+    if text[pos:pos + 1] == "}":
+        return offsets
+
+    while True:
+        key, pos = decoder.raw_decode(text, pos)
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] != ":":
+            raise ValueError(f"Expected ':' at byte {pos}")
+        start = _WHITESPACE.match(text, pos + 1).end()
+        _, pos = decoder.raw_decode(text, start)
+        offsets[key.encode("latin-1").decode("utf-8")] = (start, pos - start)
+
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] == ",":
+            pos = _WHITESPACE.match(text, pos + 1).end()
+        elif text[pos:pos + 1] == "}":
+            return offsets
+        else:
+            raise ValueError(f"Expected ',' or '}}' at byte {pos}")
+
+
+def scan_log(raw: bytes, base_offset: int = 0) -> Dict[str, Tuple[int, int]]:
+    """
+    Return {paper_id: (byte offset, byte length)} of the lines of a
+    papers_info.jsonl segment. Later lines win; an unterminated last line
+    (interrupted append) is ignored.
+    """
+    offsets: Dict[str, Tuple[int, int]] = {}
+    pos = 0
+    while True:
+        end = raw.find(b"\n", pos)
+        if end < 0:
+            return offsets
+        line = raw[pos:end]
+        if line.strip():
+            try:
+                offsets[json.loads(line)["paper_id"]] = (base_offset + pos, end - pos)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping corrupted log line at byte {base_offset + pos}: {str(e)}")
+        pos = end + 1
+
+
+def read_log(file_path: str) -> Iterator[Tuple[str, dict]]:
+    """Stream (paper_id, info) records from a papers_info.jsonl segment."""
+    try:
+        with open(file_path, "rb") as log_file:
+            for line in log_file:
+                if not line.endswith(b"\n") or not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    yield record["paper_id"], record["info"]
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Skipping corrupted line in {file_path}: {str(e)}")
+    except FileNotFoundError:
+        return
+
+
+def iter_topic_folder(topic_path: str) -> Iterator[Tuple[str, dict]]:
+    """Papers of a json-backend topic folder: the snapshot, overridden by the segments."""
+    # json.JSONDecodeError is left to the caller: a corrupted snapshot
+    # is reported differently from a missing one.
+    try:
+        with open(os.path.join(topic_path, SNAPSHOT_FILE), "r") as json_file:
+            snapshot = json.load(json_file)
+    except FileNotFoundError:
+        snapshot = {}
+
+    # Segments are small (compacted past compact_bytes): keep their newest records
+    logged: Dict[str, dict] = {}
+    for name in (COMPACTING_FILE, LOG_FILE):
+        for paper_id, info in read_log(os.path.join(topic_path, name)):
+            logged[paper_id] = info
+
+    for paper_id, info in snapshot.items():
+        yield paper_id, logged.pop(paper_id, info)
+    yield from logged.items()
+
+
+def paper_files(topic_path: str) -> List[str]:
+    """
+    Per-paper <id>.json files of a topic folder, as written by older versions
+    of research_core.py and research_server_HF.py.
+    """
+    try:
+        names = sorted(os.listdir(topic_path))
+    except FileNotFoundError:
+        return []
+    return [
+        os.path.join(topic_path, name) for name in names
+        if name.endswith(".json") and name != SNAPSHOT_FILE
+    ]
+
+
+def iter_paper_files(topic_path: str) -> Iterator[Tuple[str, dict]]:
+    for file_path in paper_files(topic_path):
+        try:
+            with open(file_path, "r", encoding="utf-8") as json_file:
+                data = json.load(json_file)
+        except (OSError, ValueError) as e:
+            print(f"Skipping unreadable paper file {file_path}: {str(e)}")
+            continue
+        # research_core.py used "paper_id", research_server_HF.py "id"
+        paper_id = (data.get("paper_id") or data.get("id")) if isinstance(data, dict) else None
+        if paper_id:
+            yield paper_id, data
+
+
+def folder_topics(paper_dir: str) -> List[str]:
+    """Topic folders of `paper_dir` holding papers in any of the file layouts."""
+    if not os.path.isdir(paper_dir):
+        return []
+    topics = []
+    for item in sorted(os.listdir(paper_dir)):
+        topic_path = os.path.join(paper_dir, item)
+        if item.startswith(".") or not os.path.isdir(topic_path):
+            continue
+        if paper_files(topic_path) or any(
+            os.path.isfile(os.path.join(topic_path, name)) for name in TOPIC_FILES
+        ):
+            topics.append(item)
+    return topics
+
+
+class PaperLocationIndex:
+    """
+    Persistent paper_id -> (file, byte offset, length) index over the topic
+    files (snapshot and log segments), stored in papers/.paper_index.json.
+
+    At startup only the topics whose files changed (mtime/size) are re-scanned,
+    appends are indexed from the bytes just written, and a lookup is one dict
+    hit, one stat and one small read.
+    """
+
+    INDEX_FILE = ".paper_index.json"
+    VERSION = 2
+
+    def __init__(self, paper_dir: str):
+        self.paper_dir = paper_dir
+        self.index_path = os.path.join(paper_dir, self.INDEX_FILE)
+        # files: {relative path: {"mtime_ns", "size", "entries": {paper_id: [offset, length]}}}
+        self.files: Dict[str, dict] = {}
+        self.papers: Dict[str, Tuple[str, int, int]] = {}
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r") as index_file:
+                data = json.load(index_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("version") != self.VERSION:
+            return
+        self.files = data.get("files", {})
+        for topic_dir in {os.path.dirname(rel_path) for rel_path in self.files}:
+            self._assign_topic(topic_dir)
+
+    def save(self) -> None:
+        with self._lock:
+            os.makedirs(self.paper_dir, exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as index_file:
+                json.dump({"version": self.VERSION, "files": self.files}, index_file)
+            os.replace(tmp_path, self.index_path)
+
+    def _topic_dirs(self) -> List[str]:
+        if not os.path.isdir(self.paper_dir):
+            return []
+        return [
+            item for item in os.listdir(self.paper_dir)
+            if any(os.path.isfile(os.path.join(self.paper_dir, item, name)) for name in TOPIC_FILES)
+        ]
+
+    def _assign_topic(self, topic_dir: str) -> None:
+        # Files are applied in TOPIC_FILES order so that the log wins over the snapshot
+        for name in TOPIC_FILES:
+            rel_path = os.path.join(topic_dir, name)
+            info = self.files.get(rel_path)
+            if info is not None:
+                for paper_id, (offset, length) in info["entries"].items():
+                    self.papers[paper_id] = (rel_path, offset, length)
+
+    def _forget_topic(self, topic_dir: str) -> None:
+        for name in TOPIC_FILES:
+            rel_path = os.path.join(topic_dir, name)
+            info = self.files.pop(rel_path, None)
+            if info is None:
+                continue
+            for paper_id in info["entries"]:
+                if self.papers.get(paper_id, (None,))[0] == rel_path:
+                    del self.papers[paper_id]
+
+    def update_topic(self, topic_dir: str) -> None:
+        """(Re)index every file of one topic, e.g. after a compaction."""
+        with self._lock:
+            self._forget_topic(topic_dir)
+            for name in TOPIC_FILES:
+                rel_path = os.path.join(topic_dir, name)
+                file_path = os.path.join(self.paper_dir, rel_path)
+                try:
+                    stat = os.stat(file_path)
+                    with open(file_path, "rb") as topic_file:
+                        raw = topic_file.read()
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    print(f"Error indexing {file_path}: {str(e)}")
+                    continue
+                try:
+                    entries = scan_offsets(raw) if name == SNAPSHOT_FILE else scan_log(raw)
+                except ValueError as e:
+                    # Remember the corrupted file so it is not re-scanned until it changes
+                    print(f"Error indexing {file_path}: {str(e)}")
+                    entries = {}
+                self.files[rel_path] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "entries": {paper_id: list(loc) for paper_id, loc in entries.items()},
+                }
+            self._assign_topic(topic_dir)
+
+    def topic_stats(self) -> Dict[str, Tuple[int, float]]:
+        """{topic folder: (distinct papers, newest file mtime)} from the indexed files."""
+        with self._lock:
+            self.refresh()
+            papers: Dict[str, set] = {}
+            updated: Dict[str, float] = {}
+            for rel_path, info in self.files.items():
+                topic_dir = os.path.dirname(rel_path)
+                papers.setdefault(topic_dir, set()).update(info["entries"])
+                updated[topic_dir] = max(updated.get(topic_dir, 0.0), info["mtime_ns"] / 1e9)
+            return {topic_dir: (len(ids), updated[topic_dir]) for topic_dir, ids in papers.items()}
+
+    def index_append(self, rel_path: str, offset: int, data: bytes, size: int) -> None:
+        """
+        Index `data` just appended at `offset` to the log segment `rel_path`,
+        whose size is now `size`. Falls back to re-scanning the topic if
+        someone else wrote to the segment in between.
+        """
+        with self._lock:
+            info = self.files.get(rel_path)
+            if (info["size"] if info else 0) != offset or offset + len(data) != size:
+                self.update_topic(os.path.dirname(rel_path))
+                return
+            entries = scan_log(data, offset)
+            if info is None:
+                info = self.files[rel_path] = {"entries": {}}
+            info["mtime_ns"] = os.stat(os.path.join(self.paper_dir, rel_path)).st_mtime_ns
+            info["size"] = size
+            for paper_id, (entry_offset, length) in entries.items():
+                info["entries"][paper_id] = [entry_offset, length]
+                self.papers[paper_id] = (rel_path, entry_offset, length)
+
+    def _is_stale(self, rel_path: str) -> bool:
+        info = self.files.get(rel_path)
+        try:
+            stat = os.stat(os.path.join(self.paper_dir, rel_path))
+        except OSError:
+            return info is not None
+        return info is None or (stat.st_mtime_ns, stat.st_size) != (info["mtime_ns"], info["size"])
+
+    def refresh(self) -> bool:
+        """Re-scan new or modified topics, drop deleted ones. Returns True if anything changed."""
+        with self._lock:
+            current = set(self._topic_dirs())
+            changed = False
+            for topic_dir in {os.path.dirname(rel_path) for rel_path in self.files} - current:
+                self._forget_topic(topic_dir)
+                changed = True
+            for topic_dir in current:
+                if any(self._is_stale(os.path.join(topic_dir, name)) for name in TOPIC_FILES):
+                    self.update_topic(topic_dir)
+                    changed = True
+            if changed:
+                self.save()
+            return changed
+
+    def read(self, paper_id: str) -> Optional[dict]:
+        """Return the info of `paper_id` by reading only its bytes, or None."""
+        with self._lock:
+            location = self.papers.get(paper_id)
+            if location is None:
+                return None
+            if self._is_stale(location[0]):
+                # Written behind our back: re-scan this topic only
+                self.update_topic(os.path.dirname(location[0]))
+                self.save()
+                location = self.papers.get(paper_id)
+                if location is None:
+                    return None
+
+            rel_path, offset, length = location
+            with open(os.path.join(self.paper_dir, rel_path), "rb") as topic_file:
+                topic_file.seek(offset)
+                raw = topic_file.read(length)
+
+        if rel_path.endswith(SNAPSHOT_FILE):
+            return json.loads(raw)
+        return json.loads(raw)["info"]
+
+
+class JsonPaperStore(PaperStore):
+    """
+    One folder per topic holding a papers_info.json snapshot and an
+    append-only papers_info.jsonl segment.
+
+    New papers are appended to the segment (O(new papers), no lost updates
+    between concurrent writers); once the segment passes `compact_bytes` it is
+    merged into the snapshot by a background thread. Lookups by ID go through
+    a PaperLocationIndex.
+    """
+
+    def __init__(self, paper_dir: str = PAPER_DIR, compact_bytes: Optional[int] = None):
+        super().__init__()
+        self.paper_dir = paper_dir
+        if compact_bytes is None:
+            compact_bytes = int(os.environ.get("PAPER_LOG_COMPACT_BYTES", DEFAULT_COMPACT_BYTES))
+        self.compact_bytes = compact_bytes
+        self.index = PaperLocationIndex(paper_dir)
+        self.index.refresh()
+        self._lock = threading.Lock()
+        self._topic_locks: Dict[str, threading.Lock] = {}
+        # Held for a whole compaction: one merge per topic at a time
+        self._compaction_locks: Dict[str, threading.Lock] = {}
+        self._compactions: Dict[str, threading.Thread] = {}
+
+    def _topic_path(self, topic_dir: str, name: str) -> str:
+        return os.path.join(self.paper_dir, topic_dir, name)
+
+    def _topic_lock(self, topic_dir: str) -> threading.Lock:
+        with self._lock:
+            return self._topic_locks.setdefault(topic_dir, threading.Lock())
+
+    def _compaction_lock(self, topic_dir: str) -> threading.Lock:
+        with self._lock:
+            return self._compaction_locks.setdefault(topic_dir, threading.Lock())
+
+    def location(self, topic: str) -> str:
+        return self._topic_path(topic_key(topic), LOG_FILE)
+
+    def add_papers(self, topic: str, papers: Dict[str, dict]) -> None:
+        if not papers:
+            return
+        topic_dir = topic_key(topic)
+        os.makedirs(os.path.join(self.paper_dir, topic_dir), exist_ok=True)
+        data = b"".join(
+            json.dumps({"paper_id": paper_id, "info": info}).encode("utf-8") + b"\n"
+            for paper_id, info in papers.items()
+        )
+
+        with self._topic_lock(topic_dir):
+            # A single write() on an O_APPEND file: concurrent writers never overwrite each other
+            with open(self._topic_path(topic_dir, LOG_FILE), "ab") as log_file:
+                offset = log_file.tell()
+                log_file.write(data)
+                log_file.flush()
+                size = os.fstat(log_file.fileno()).st_size
+            # The on-disk index is not rewritten here: at startup a grown
+            # segment is simply re-scanned (it is bounded by compact_bytes).
+            self.index.index_append(os.path.join(topic_dir, LOG_FILE), offset, data, size)
+
+        self._notify(topic_dir, papers)
+
+        if size >= self.compact_bytes:
+            self._schedule_compaction(topic_dir)
+
+    def _schedule_compaction(self, topic_dir: str) -> None:
+        with self._lock:
+            running = self._compactions.get(topic_dir)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(
+                target=self.compact, args=(topic_dir,), name=f"compact-{topic_dir}", daemon=True
+            )
+            self._compactions[topic_dir] = thread
+            # Started under the lock, so a concurrent caller sees it alive
+            thread.start()
+
+    def compact(self, topic: str) -> None:
+        """Merge the log segment of `topic` into its papers_info.json snapshot."""
+        topic_dir = topic_key(topic)
+        with self._compaction_lock(topic_dir):
+            self._compact(topic_dir)
+
+    def _compact(self, topic_dir: str) -> None:
+        snapshot_path = self._topic_path(topic_dir, SNAPSHOT_FILE)
+        compacting_path = self._topic_path(topic_dir, COMPACTING_FILE)
+
+        with self._topic_lock(topic_dir):
+            # Appends made during the merge go to a fresh segment. No other
+            # compaction of this topic is running (compaction lock held), so a
+            # leftover .compacting file comes from an interrupted one: finish it first.
+            if not os.path.exists(compacting_path):
+                try:
+                    os.replace(self._topic_path(topic_dir, LOG_FILE), compacting_path)
+                except FileNotFoundError:
+                    return
+
+        try:
+            try:
+                with open(snapshot_path, "r") as json_file:
+                    papers_info = json.load(json_file)
+            except FileNotFoundError:
+                papers_info = {}
+            for paper_id, info in read_log(compacting_path):
+                papers_info[paper_id] = info
+
+            # Own temporary file: another process may be compacting the same topic
+            tmp_path = f"{snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as json_file:
+                json.dump(papers_info, json_file, indent=2)
+            os.replace(tmp_path, snapshot_path)
+            os.remove(compacting_path)
+        except (OSError, json.JSONDecodeError) as e:
+            # The segment stays in place and is still read alongside the snapshot
+            print(f"Error compacting {topic_dir}: {str(e)}")
+        finally:
+            self.index.update_topic(topic_dir)
+            self.index.save()
+
+    def compact_all(self) -> None:
+        for topic_dir in self.list_topics():
+            self.compact(topic_dir)
+
+    def get_paper(self, paper_id: str) -> Optional[dict]:
+        paper_info = self.index.read(paper_id)
+        if paper_info is None and self.index.refresh():
+            # Unknown ID but some topic changed on disk since the last scan
+            paper_info = self.index.read(paper_id)
+        return paper_info
+
+    def iter_topic_papers(self, topic: str) -> Iterator[Tuple[str, dict]]:
+        return iter_topic_folder(os.path.join(self.paper_dir, topic_key(topic)))
+
+    def get_topic_papers(self, topic: str) -> Optional[Dict[str, dict]]:
+        topic_dir = topic_key(topic)
+        if not any(os.path.exists(self._topic_path(topic_dir, name)) for name in TOPIC_FILES):
+            return None
+        return dict(self.iter_topic_papers(topic))
+
+    def topic_version(self, topic: str) -> Hashable:
+        versions = []
+        for name in TOPIC_FILES:
+            try:
+                stat = os.stat(self._topic_path(topic_key(topic), name))
+                versions.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                versions.append(None)
+        return tuple(versions)
+
+    def list_topics(self) -> List[str]:
+        return self.index._topic_dirs()
+
+    def topic_stats(self) -> Dict[str, Tuple[int, float]]:
+        return self.index.topic_stats()
+
+    def catalog_version(self) -> Hashable:
+        # New topic folders change the mtime of papers/; appends by another
+        # process to an existing topic are only seen by a full refresh.
+        try:
+            return os.stat(self.paper_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            threads = list(self._compactions.values())
+        for thread in threads:
+            thread.join()
+        self.index.save()
+
+
+class SqlitePaperStore(PaperStore):
+    """
+    All papers in one SQLite database: one row per paper whatever the number
+    of topics that found it, plus one topic_membership row per (topic, paper).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS papers (
+            paper_id   TEXT PRIMARY KEY,
+            data       TEXT NOT NULL,
+            published  TEXT,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS topic_membership (
+            topic    TEXT NOT NULL,
+            paper_id TEXT NOT NULL REFERENCES papers(paper_id),
+            added_at REAL NOT NULL,
+            PRIMARY KEY (topic, paper_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_membership_paper ON topic_membership(paper_id);
+        -- Indexes end with the rowid: members of a topic in insertion order
+        CREATE INDEX IF NOT EXISTS idx_membership_topic ON topic_membership(topic);
+        -- Per-topic summary kept up to date by _insert
+        CREATE TABLE IF NOT EXISTS topics (
+            topic      TEXT PRIMARY KEY,
+            papers     INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        -- Store-level state (see MIGRATION_DONE, CATALOG_WRITES)
+        CREATE TABLE IF NOT EXISTS meta (
+            key   TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__()
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection per thread: sqlite3 connections must not be shared
+        # across threads, and WAL lets readers run next to a writer. They are
+        # opened with check_same_thread=False only so that close() can close
+        # them all from the calling thread; each one is used by its own thread.
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        # Writes of this process already announced to the listeners
+        self._notified_writes = 0
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+            if conn.execute("SELECT 1 FROM topics LIMIT 1").fetchone() is None:
+                # Database created before the topics table
+                conn.execute(
+                    """
+                    INSERT INTO topics (topic, papers, updated_at)
+                    SELECT topic, COUNT(*), MAX(added_at) FROM topic_membership GROUP BY topic
+                    """
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def location(self, topic: str) -> str:
+        return f"{self.db_path} (topic: {topic_key(topic)})"
+
+    def _insert(
+        self, conn: sqlite3.Connection, topic: str, papers: Dict[str, dict], now: float, replace: bool = True
+    ) -> None:
+        topic = topic_key(topic)
+        on_conflict = (
+            """
+            DO UPDATE SET
+                data = excluded.data,
+                published = excluded.published,
+                updated_at = excluded.updated_at
+            """
+            if replace else "DO NOTHING"
+        )
+        conn.executemany(
+            f"""
+            INSERT INTO papers (paper_id, data, published, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(paper_id) {on_conflict}
+            """,
+            [
+                (paper_id, json.dumps(info), info.get("published"), now)
+                for paper_id, info in papers.items()
+            ],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO topic_membership (topic, paper_id, added_at) VALUES (?, ?, ?)",
+            [(topic, paper_id, now) for paper_id in papers],
+        )
+        # An import (migration run again, older files) never makes a topic look older
+        updated_at = "excluded.updated_at" if replace else "MAX(updated_at, excluded.updated_at)"
+        conn.execute(
+            f"""
+            INSERT INTO topics (topic, papers, updated_at)
+            VALUES (?, (SELECT COUNT(*) FROM topic_membership WHERE topic = ?), ?)
+            ON CONFLICT(topic) DO UPDATE SET papers = excluded.papers, updated_at = {updated_at}
+            """,
+            (topic, topic, now),
+        )
+        if replace:
+            # The papers may also belong to other topics, whose content changed too
+            conn.executemany(
+                """
+                UPDATE topics SET updated_at = ?
+                WHERE topic IN (SELECT topic FROM topic_membership WHERE paper_id = ?)
+                """,
+                [(now, paper_id) for paper_id in papers],
+            )
+
+    def add_papers(self, topic: str, papers: Dict[str, dict]) -> None:
+        self.add_papers_by_topic({topic: papers})
+
+    def _count_write(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            INSERT INTO meta (key, value) VALUES (?, 1)
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+            """,
+            (CATALOG_WRITES,),
+        )
+
+    def add_papers_by_topic(self, papers_by_topic: Dict[str, Dict[str, dict]]) -> None:
+        # One transaction for every topic
+        now = time.time()
+        if not any(papers_by_topic.values()):
+            return
+        with self._connect() as conn:
+            for topic, papers in papers_by_topic.items():
+                if papers:
+                    self._insert(conn, topic, papers, now)
+            self._count_write(conn)
+        with self._lock:
+            self._notified_writes += 1
+        for topic, papers in papers_by_topic.items():
+            if papers:
+                self._notify(topic, papers)
+
+    def import_papers(self, topic: str, papers: Dict[str, dict], added_at: Optional[float] = None) -> None:
+        """
+        Add `papers` to `topic` without replacing the body of papers already
+        stored (used by migrations, which may read older copies), recorded as
+        added at `added_at` (default: now). Listeners are not notified.
+        """
+        if papers:
+            with self._connect() as conn:
+                self._insert(conn, topic, papers, added_at or time.time(), replace=False)
+                # Counted as a write the listeners did not see
+                self._count_write(conn)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def count_papers(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def get_paper(self, paper_id: str) -> Optional[dict]:
+        row = self._connect().execute(
+            "SELECT data FROM papers WHERE paper_id = ?", (paper_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_papers(self, paper_ids: List[str]) -> Dict[str, dict]:
+        papers = {}
+        conn = self._connect()
+        # Stay below SQLite's limit on the number of bound parameters
+        for start in range(0, len(paper_ids), 500):
+            chunk = paper_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT paper_id, data FROM papers WHERE paper_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            papers.update((paper_id, json.loads(data)) for paper_id, data in rows)
+        return papers
+
+    def iter_topic_papers(self, topic: str) -> Iterator[Tuple[str, dict]]:
+        cursor = self._connect().execute(
+            """
+            SELECT p.paper_id, p.data
+            FROM topic_membership m JOIN papers p ON p.paper_id = m.paper_id
+            WHERE m.topic = ?
+            ORDER BY m.rowid
+            """,
+            (topic_key(topic),),
+        )
+        for paper_id, data in cursor:
+            yield paper_id, json.loads(data)
+
+    def get_topic_papers(self, topic: str) -> Optional[Dict[str, dict]]:
+        papers = dict(self.iter_topic_papers(topic))
+        return papers or None
+
+    def iter_topic_page(self, topic: str, offset: int, limit: int) -> Iterator[Tuple[str, dict]]:
+        # The offset is skipped on the membership index alone, only the page joins papers
+        cursor = self._connect().execute(
+            """
+            SELECT p.paper_id, p.data
+            FROM (
+                SELECT paper_id, rowid AS position FROM topic_membership
+                WHERE topic = ? ORDER BY rowid LIMIT ? OFFSET ?
+            ) m JOIN papers p ON p.paper_id = m.paper_id
+            ORDER BY m.position
+            """,
+            (topic_key(topic), limit, offset),
+        )
+        for paper_id, data in cursor:
+            yield paper_id, json.loads(data)
+
+    def count_topic_papers(self, topic: str) -> int:
+        row = self._connect().execute(
+            "SELECT papers FROM topics WHERE topic = ?", (topic_key(topic),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def topic_version(self, topic: str) -> Hashable:
+        return self._connect().execute(
+            "SELECT papers, updated_at FROM topics WHERE topic = ?", (topic_key(topic),)
+        ).fetchone()
+
+    def latest_published(self, topic: str) -> Optional[str]:
+        row = self._connect().execute(
+            """
+            SELECT MAX(substr(p.published, 1, 10))
+            FROM topic_membership m JOIN papers p ON p.paper_id = m.paper_id
+            WHERE m.topic = ?
+            """,
+            (topic_key(topic),),
+        ).fetchone()
+        return row[0] if row else None
+
+    def list_topics(self) -> List[str]:
+        rows = self._connect().execute("SELECT topic FROM topics ORDER BY topic").fetchall()
+        return [row[0] for row in rows]
+
+    def topic_stats(self) -> Dict[str, Tuple[int, float]]:
+        rows = self._connect().execute("SELECT topic, papers, updated_at FROM topics").fetchall()
+        return {topic: (papers, updated_at) for topic, papers, updated_at in rows}
+
+    def catalog_version(self) -> Hashable:
+        # Every write transaction bumps the counter; those of this process already
+        # reached the listeners, so only writes from other processes (and imports)
+        # change the version
+        writes = self.get_meta(CATALOG_WRITES)
+        with self._lock:
+            return int(writes or 0) - self._notified_writes
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def migrate_topic(paper_dir: str, topic: str, store: SqlitePaperStore, batch_size: int = MIGRATION_BATCH) -> int:
+    """
+    Stream one topic folder (snapshot, segments and per-paper files) into
+    `store`, `batch_size` papers per transaction.
+
+    Returns:
+        Number of records read from the folder
+    """
+    topic_path = os.path.join(paper_dir, topic)
+    # The topic keeps the date of its files as last update
+    mtimes = [
+        os.path.getmtime(file_path)
+        for file_path in [os.path.join(topic_path, name) for name in TOPIC_FILES] + paper_files(topic_path)
+        if os.path.isfile(file_path)
+    ]
+    added_at = max(mtimes, default=None)
+    read = 0
+    batch: Dict[str, dict] = {}
+    for records in (iter_topic_folder(topic_path), iter_paper_files(topic_path)):
+        for paper_id, info in records:
+            batch[paper_id] = info
+            read += 1
+            if len(batch) >= batch_size:
+                store.import_papers(topic, batch, added_at)
+                batch = {}
+    store.import_papers(topic, batch, added_at)
+    return read
+
+
+def migrate_folders(paper_dir: str, store: SqlitePaperStore) -> Dict[str, int]:
+    """
+    Migrate every topic folder of `paper_dir` into `store`. Safe to run again:
+    papers already in the database are kept as they are. Once every folder
+    went through, MIGRATION_DONE is recorded in the store.
+
+    Returns:
+        {topic: number of records read}
+    """
+    migrated = {}
+    failed = False
+    for topic in folder_topics(paper_dir):
+        try:
+            migrated[topic] = migrate_topic(paper_dir, topic, store)
+        except (OSError, ValueError) as e:
+            # The other topics are still migrated; this one is retried next time
+            failed = True
+            print(f"Error migrating topic {topic}: {str(e)}")
+    if not failed:
+        store.set_meta(MIGRATION_DONE, str(time.time()))
+    return migrated
+
+
+def open_store(paper_dir: str = PAPER_DIR, backend: Optional[str] = None) -> PaperStore:
+    """
+    Build the store selected by `backend` (or $PAPER_STORE_BACKEND).
+
+    Args:
+        paper_dir: Root directory of the paper store
+        backend: "sqlite" or "json" (default: $PAPER_STORE_BACKEND, then "sqlite")
+    """
+    backend = (backend or os.environ.get("PAPER_STORE_BACKEND", DEFAULT_BACKEND)).lower()
+    if backend == "json":
+        return JsonPaperStore(paper_dir)
+    if backend == "sqlite":
+        store = SqlitePaperStore(os.path.join(paper_dir, DB_FILE))
+        if store.get_meta(MIGRATION_DONE) is None:
+            # Bring the papers of the topic folders into the database, at every
+            # start until all of them made it (an unreadable folder is retried)
+            migrate_folders(paper_dir, store)
+        return store
+    raise ValueError(f"Unknown paper store backend: {backend!r} (expected 'json' or 'sqlite')")
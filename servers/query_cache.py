@@ -0,0 +1,168 @@
+"""
+TTL + LRU cache of arXiv query results for search_papers.
+
+Results are keyed by the normalized (topic, max_results, sort) query and kept
+in two tiers: a size-bounded in-memory LRU, and one JSON file per query on disk
+so that they survive server restarts. Both tiers honour the same TTL.
+
+Configuration (environment variables):
+  ARXIV_CACHE_TTL   time to live in seconds, 0 disables the cache (default: 3600)
+  ARXIV_CACHE_SIZE  maximum number of queries kept in memory (default: 256)
+  ARXIV_CACHE_DIR   on-disk tier, empty to disable it (default: papers/.arxiv_cache)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+DEFAULT_TTL = 3600
+DEFAULT_SIZE = 256
+DEFAULT_DIR = os.path.join("papers", ".arxiv_cache")
+
+
+def query_key(topic: str, max_results: int, sort: str) -> Tuple[str, int, str]:
+    """Normalize a query: case and whitespace in the topic do not matter."""
+    return (" ".join(topic.lower().split()), int(max_results), sort.lower())
+
+
+class QueryCache:
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
+        self.ttl = float(os.environ.get("ARXIV_CACHE_TTL", DEFAULT_TTL)) if ttl is None else ttl
+        self.max_entries = (
+            int(os.environ.get("ARXIV_CACHE_SIZE", DEFAULT_SIZE)) if max_entries is None else max_entries
+        )
+        self.cache_dir = os.environ.get("ARXIV_CACHE_DIR", DEFAULT_DIR) if cache_dir is None else cache_dir
+
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+        self._prune_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _disk_path(self, key: Tuple[str, int, str]) -> str:
+        digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _remember(self, key: Tuple[str, int, str], stored_at: float, value: Any) -> None:
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _prune_disk(self) -> None:
+        """Drop expired on-disk entries (file mtime is their storage time)."""
+        if not self.enabled or not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+        deadline = time.time() - self.ttl
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if os.path.getmtime(path) < deadline:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _read_disk(self, key: Tuple[str, int, str]) -> Optional[Tuple[float, Any]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r") as cache_file:
+                data = json.load(cache_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if tuple(data.get("key", ())) != key:
+            return None
+        return data["stored_at"], data["value"]
+
+    def _write_disk(self, key: Tuple[str, int, str], stored_at: float, value: Any) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as cache_file:
+                json.dump({"key": key, "stored_at": stored_at, "value": value}, cache_file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing query cache entry: {str(e)}")
+
+    def _drop_disk(self, key: Tuple[str, int, str]) -> None:
+        if self.cache_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def get(self, topic: str, max_results: int, sort: str) -> Optional[Any]:
+        """Return the cached result of a query, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = query_key(topic, max_results, sort)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            tier = "memory_hits"
+            if entry is None:
+                entry = self._read_disk(key)
+                tier = "disk_hits"
+
+            if entry is not None and now - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self._drop_disk(key)
+                self.counters["expired"] += 1
+                entry = None
+
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+
+            self._remember(key, *entry)
+            self.counters["hits"] += 1
+            self.counters[tier] += 1
+            return entry[1]
+
+    def put(self, topic: str, max_results: int, sort: str, value: Any) -> None:
+        """Store the (JSON serializable) result of a query in both tiers."""
+        if not self.enabled:
+            return
+        key = query_key(topic, max_results, sort)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, stored_at, value)
+            self._write_disk(key, stored_at, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and settings, for operators."""
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk_dir": self.cache_dir or None,
+            }
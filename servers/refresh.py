@@ -0,0 +1,46 @@
+"""
+Incremental refresh of stored topics: only the papers submitted since the
+newest one already stored are fetched from arXiv and merged into the store.
+
+Nightly refresh of every stored topic:
+    uv run servers/refresh.py [max_results]
+"""
+
+import sys
+from typing import Dict
+
+from arxiv_client import search_arxiv_since
+from paper_store import PAPER_DIR, PaperStore, open_store
+
+
+DEFAULT_MAX_RESULTS = 50
+
+
+def refresh_topic_papers(store: PaperStore, topic: str, max_results: int = DEFAULT_MAX_RESULTS) -> Dict[str, dict]:
+    """
+    Fetch and store the papers of `topic` that are newer than the stored ones.
+
+    Returns:
+        {paper_id: info} of the papers added (empty if the topic is up to date)
+    """
+    since = store.latest_published(topic)
+    known_ids = set(store.get_topic_papers(topic) or {})
+
+    # Topic folders use underscores, arXiv wants the words back
+    new_papers = search_arxiv_since(topic.replace("_", " "), since, known_ids, max_results)
+    store.add_papers(topic, new_papers)
+    return new_papers
+
+
+if __name__ == "__main__":
+    max_results = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MAX_RESULTS
+    store = open_store(PAPER_DIR)
+    try:
+        for topic in store.list_topics():
+            try:
+                new_papers = refresh_topic_papers(store, topic, max_results)
+                print(f"{topic}: {len(new_papers)} new papers")
+            except Exception as e:
+                print(f"{topic}: error {str(e)}")
+    finally:
+        store.close()
@@ -23,167 +23,84 @@ logging.basicConfig(
 
 # Fin de la redirection des print() vers stderr
 
-import arxiv
 import json
-import os
-from typing import List
+import time
 from mcp.server.fastmcp import FastMCP
+from executors import run_read
+from research_tools import register_research_tools, store
+from topic_catalog import TopicCatalog
+from topic_pages import DEFAULT_PAGE_SIZE, TopicPages
 
-PAPER_DIR = "papers"
+# Topics with their paper counts, served by papers://folders from memory
+topic_catalog = TopicCatalog(store)
+
+# Rendered pages of the papers://{topic} resources, dropped when the topic changes
+topic_pages = TopicPages(store)
 
 # Initialize FastMCP server
 mcp = FastMCP("research")
 
-@mcp.tool()
-def search_papers(topic: str, max_results: int = 5) -> List[str]:
-    """
-    Search for papers on arXiv based on a topic and store their information.
-
-    Args:
-        topic: The topic to search for
-        max_results: Maximum number of results to retrieve (default: 5)
-
-    Returns:
-        List of paper IDs found in the search
-    """
-
-    # Use arxiv to find the papers
-    client = arxiv.Client()
-
-    # Search for the most relevant articles matching the queried topic
-    search = arxiv.Search(
-        query = topic,
-        max_results = max_results,
-        sort_by = arxiv.SortCriterion.Relevance
-    )
-
-    papers = client.results(search)
-
-    # Create directory for this topic
-    path = os.path.join(PAPER_DIR, topic.lower().replace(" ", "_"))
-    os.makedirs(path, exist_ok=True)
-
-    file_path = os.path.join(path, "papers_info.json")
-
-    # Try to load existing papers info
-    try:
-        with open(file_path, "r") as json_file:
-            papers_info = json.load(json_file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        papers_info = {}
-
-    # Process each paper and add to papers_info
-    paper_ids = []
-    for paper in papers:
-        paper_ids.append(paper.get_short_id())
-        paper_info = {
-            'title': paper.title,
-            'authors': [author.name for author in paper.authors],
-            'summary': paper.summary,
-            'pdf_url': paper.pdf_url,
-            'published': str(paper.published.date())
-        }
-        papers_info[paper.get_short_id()] = paper_info
-
-    # Save updated papers_info to json file
-    with open(file_path, "w") as json_file:
-        json.dump(papers_info, json_file, indent=2)
-
-    print(f"Results are saved in: {file_path}")
-
-    return paper_ids
-
-@mcp.tool()
-def extract_info(paper_id: str) -> str:
-    """
-    Search for information about a specific paper across all topic directories.
-
-    Args:
-        paper_id: The ID of the paper to look for
-
-    Returns:
-        JSON string with paper information if found, error message if not found
-    """
-
-    for item in os.listdir(PAPER_DIR):
-        item_path = os.path.join(PAPER_DIR, item)
-        if os.path.isdir(item_path):
-            file_path = os.path.join(item_path, "papers_info.json")
-            if os.path.isfile(file_path):
-                try:
-                    with open(file_path, "r") as json_file:
-                        papers_info = json.load(json_file)
-                        if paper_id in papers_info:
-                            return json.dumps(papers_info[paper_id], indent=2)
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    print(f"Error reading {file_path}: {str(e)}")
-                    continue
-
-    return f"There's no saved information related to paper {paper_id}."
-
+# Tools shared by the research servers (see research_tools.py)
+register_research_tools(mcp)
 
 
 @mcp.resource("papers://folders")
-def get_available_folders() -> str:
+async def get_available_folders() -> str:
     """
     List all available topic folders in the papers directory.
 
-    This resource provides a simple list of all available topic folders.
+    This resource provides a list of all available topic folders, with their
+    number of papers and last update.
     """
-    folders = []
-
-    # Get all topic directories
-    if os.path.exists(PAPER_DIR):
-        for topic_dir in os.listdir(PAPER_DIR):
-            #print(topic_dir)
-            topic_path = os.path.join(PAPER_DIR, topic_dir)
-            if os.path.isdir(topic_path):
-                papers_file = os.path.join(topic_path, "papers_info.json")
-                if os.path.exists(papers_file):
-                    folders.append(topic_dir)
+    folders = await run_read(topic_catalog.topics)
 
     # Create a simple markdown list
-    content = "# Available Topics\n\n"
+    lines = ["# Available Topics\n\n"]
     if folders:
-        for folder in folders:
-            content += f"- {folder}\n"
-        content += f"\nUse @{folder} to access papers in that topic.\n"
+        for folder, papers, updated_at in folders:
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(updated_at))
+            lines.append(f"- {folder} ({papers} papers, updated {updated})\n")
+        lines.append(f"\nUse @{folder} to access papers in that topic.\n")
     else:
-        content += "No topics found.\n"
+        lines.append("No topics found.\n")
 
-    return content
+    return "".join(lines)
 
 @mcp.resource("papers://{topic}")
-def get_topic_papers(topic: str) -> str:
+async def get_topic_papers(topic: str) -> str:
     """
-    Get detailed information about papers on a specific topic.
+    Get detailed information about papers on a specific topic (first page).
 
     Args:
         topic: The research topic to retrieve papers for
     """
-    topic_dir = topic.lower().replace(" ", "_")
-    papers_file = os.path.join(PAPER_DIR, topic_dir, "papers_info.json")
+    return await get_topic_papers_page(topic, 1, DEFAULT_PAGE_SIZE)
 
-    if not os.path.exists(papers_file):
-        return f"# No papers found for topic: {topic}\n\nTry searching for papers on this topic first."
+@mcp.resource("papers://{topic}/page/{page}")
+async def get_topic_papers_page_default(topic: str, page: int) -> str:
+    """
+    Get one page of the papers on a specific topic.
 
-    try:
-        with open(papers_file, 'r') as f:
-            papers_data = json.load(f)
-
-        # Create markdown content with paper details
-        content = f"# Papers on {topic.replace('_', ' ').title()}\n\n"
-        content += f"Total papers: {len(papers_data)}\n\n"
-
-        for paper_id, paper_info in papers_data.items():
-            content += f"## {paper_info['title']}\n"
-            content += f"- **Paper ID**: {paper_id}\n"
-            content += f"- **Authors**: {', '.join(paper_info['authors'])}\n"
-            content += f"- **Published**: {paper_info['published']}\n"
-            content += f"- **PDF URL**: [{paper_info['pdf_url']}]({paper_info['pdf_url']})\n\n"
-            content += f"### Summary\n{paper_info['summary'][:500]}...\n\n"
-            content += "---\n\n"
+    Args:
+        topic: The research topic to retrieve papers for
+        page: Page number, starting at 1
+    """
+    return await get_topic_papers_page(topic, page, DEFAULT_PAGE_SIZE)
+
+@mcp.resource("papers://{topic}/page/{page}/size/{size}")
+async def get_topic_papers_page(topic: str, page: int, size: int) -> str:
+    """
+    Get one page of the papers on a specific topic, with a custom page size.
 
+    Args:
+        topic: The research topic to retrieve papers for
+        page: Page number, starting at 1
+        size: Number of papers per page (at most 100)
+    """
+    try:
+        content = await run_read(topic_pages.get, topic, int(page), int(size))
+        if content is None:
+            return f"# No papers found for topic: {topic}\n\nTry searching for papers on this topic first."
         return content
     except json.JSONDecodeError:
         return f"# Error reading papers data for {topic}\n\nThe papers data file is corrupted."
@@ -0,0 +1,268 @@
+"""
+Research tools shared by the research servers (research_server.py,
+research_server_L7.py and research_server_L9.py).
+
+The paper store and the caches behind the tools are created once per process;
+register_research_tools(mcp) adds the tools and the stats://arxiv-cache
+resource to a FastMCP server. Each server only keeps what its lesson adds:
+transport, logging, prompts and the papers:// resources.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+from mcp.server.fastmcp import FastMCP
+from arxiv_client import search_arxiv
+from executors import run_read, run_search
+from local_search import BM25Index
+from output_format import PLAIN, RECORD_MAP, RECORDS, dump
+from paper_store import open_store, topic_key
+from query_cache import QueryCache, query_key
+from refresh import refresh_topic_papers
+from similarity import TfidfIndex
+from single_flight import SingleFlight
+
+
+PAPER_DIR = "papers"
+
+# Paper storage backend (json or sqlite, see paper_store.py)
+store = open_store(PAPER_DIR)
+
+# Full-text index of the stored papers, updated on every store write
+local_index = BM25Index(store)
+
+# TF-IDF matrix of the stored papers, for find_similar_papers
+similarity_index = TfidfIndex(store, PAPER_DIR)
+
+# arXiv query results cache (TTL + LRU, see query_cache.py)
+query_cache = QueryCache()
+
+# Identical concurrent searches share one arXiv query (and one store write)
+searches = SingleFlight()
+
+# Concurrent arXiv queries issued by search_papers_batch
+BATCH_CONCURRENCY = int(os.environ.get("ARXIV_BATCH_CONCURRENCY", "4"))
+
+def fetch_papers(topic: str, max_results: int) -> Dict[str, dict]:
+    """
+    Return {paper_id: info} for the most relevant arXiv papers on a topic,
+    reusing the result of a recent identical query if we have one.
+    """
+    papers_info = query_cache.get(topic, max_results, "relevance")
+    if papers_info is None:
+        # Use arxiv to find the papers (shared, rate-limited client)
+        papers_info = search_arxiv(topic, max_results)
+        query_cache.put(topic, max_results, "relevance", papers_info)
+    return papers_info
+
+async def fetch_papers_once(topic: str, max_results: int) -> Dict[str, dict]:
+    """fetch_papers in the search pool, shared by identical concurrent queries."""
+    return await searches.run(
+        ("fetch",) + query_key(topic, max_results, "relevance"),
+        lambda: run_search(fetch_papers, topic, max_results),
+    )
+
+async def search_papers(topic: str, max_results: int = 5) -> List[str]:
+    """
+    Search for papers on arXiv based on a topic and store their information.
+
+    Args:
+        topic: The topic to search for
+        max_results: Maximum number of results to retrieve (default: 5)
+
+    Returns:
+        List of paper IDs found in the search
+    """
+
+    async def search_and_store() -> Dict[str, dict]:
+        # Blocking arXiv query and write run in the search pool, not on the event loop
+        papers_info = await fetch_papers_once(topic, max_results)
+
+        # Save the new papers; only these rows are written by the store
+        await run_search(store.add_papers, topic, papers_info)
+
+        print(f"Results are saved in: {store.location(topic)}")
+        return papers_info
+
+    # Concurrent identical calls await the same query and the same write
+    papers_info = await searches.run(("search", topic_key(topic), max_results), search_and_store)
+    paper_ids = list(papers_info)
+
+    return paper_ids
+
+async def search_papers_batch(topics: List[str], max_results: int = 5) -> str:
+    """
+    Search for papers on several topics at once and store their information.
+    Prefer this over several search_papers calls when researching related topics.
+
+    Args:
+        topics: The topics to search for
+        max_results: Maximum number of results to retrieve per topic (default: 5)
+
+    Returns:
+        JSON object mapping each topic to the list of paper IDs found (or an error message)
+    """
+
+    # Same topic twice: one query
+    topics = list(dict.fromkeys(topics))
+
+    # The queries run concurrently; the shared client still spaces the requests
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def fetch(topic: str) -> Dict[str, dict]:
+        async with semaphore:
+            return await fetch_papers_once(topic, max_results)
+
+    outcomes = await asyncio.gather(*(fetch(topic) for topic in topics), return_exceptions=True)
+
+    results: Dict[str, Union[List[str], str]] = {}
+    papers_by_topic = {}
+    for topic, outcome in zip(topics, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"Error searching papers on {topic}: {str(outcome)}")
+            results[topic] = f"Error searching papers on {topic}: {str(outcome)}"
+        else:
+            papers_by_topic[topic] = outcome
+            results[topic] = list(outcome)
+
+    # One write for all the topics
+    await run_search(store.add_papers_by_topic, papers_by_topic)
+
+    print(f"Batch results for {len(papers_by_topic)} topics are saved")
+
+    return dump(results, layout=PLAIN)
+
+async def refresh_topic(topic: str, max_results: int = 50) -> List[str]:
+    """
+    Fetch only the papers published on a topic since the newest one already stored.
+    Use this instead of search_papers to update a topic that was searched before.
+
+    Args:
+        topic: The topic to refresh
+        max_results: Maximum number of recent papers to look at (default: 50)
+
+    Returns:
+        List of the new paper IDs (empty if the topic is already up to date)
+    """
+
+    new_papers = await searches.run(
+        ("refresh", topic_key(topic)),
+        lambda: run_search(refresh_topic_papers, store, topic, max_results),
+    )
+
+    print(f"{len(new_papers)} new papers saved in: {store.location(topic)}")
+
+    return list(new_papers)
+
+async def search_local(query: str, k: int = 10) -> str:
+    """
+    Search the papers already stored locally (titles, summaries, authors), without
+    querying arXiv. Try this before search_papers: it answers in milliseconds.
+
+    Args:
+        query: Keywords to look for
+        k: Maximum number of papers to return (default: 10)
+
+    Returns:
+        JSON list of the best matching papers, as paper_id, title and relevance score
+    """
+
+    return dump(await run_read(local_index.search, query, k), layout=RECORDS)
+
+async def find_similar_papers(paper_id: str, k: int = 5) -> str:
+    """
+    Find the stored papers whose title and summary are closest to a given paper.
+
+    Args:
+        paper_id: The ID of a stored paper
+        k: Maximum number of similar papers to return (default: 5)
+
+    Returns:
+        JSON list of the most similar papers, as paper_id, title and cosine
+        similarity, or an error message
+    """
+
+    similar = await run_read(similarity_index.similar, paper_id, k)
+    if similar is None:
+        return f"There's no saved information related to paper {paper_id}."
+    return dump(similar, layout=RECORDS)
+
+async def extract_info(paper_id: str, output_format: Optional[str] = None, summary_chars: Optional[int] = None) -> str:
+    """
+    Search for information about a specific paper across all topic directories.
+
+    Args:
+        paper_id: The ID of the paper to look for
+        output_format: "compact" (default), "minimal" (short keys: t=title,
+            a=authors, s=summary, u=pdf_url, l=url, p=published) or "pretty"
+        summary_chars: Truncate summaries to this many characters (0: full summary)
+
+    Returns:
+        JSON string with paper information if found, error message if not found
+    """
+
+    paper_info = await run_read(store.get_paper, paper_id)
+    if paper_info is not None:
+        return dump(paper_info, output_format, summary_chars)
+
+    return f"There's no saved information related to paper {paper_id}."
+
+async def get_papers(
+    paper_ids: List[str],
+    fields: Optional[List[str]] = None,
+    output_format: Optional[str] = None,
+    summary_chars: Optional[int] = None,
+) -> str:
+    """
+    Get the information of several papers in one call. Prefer this over one
+    extract_info call per paper, and ask only for the fields you need.
+
+    Args:
+        paper_ids: The IDs of the papers to look for
+        fields: Fields to return for each paper, among title, authors, summary,
+            pdf_url and published (default: all)
+        output_format: "compact" (default), "minimal" (short keys: t=title,
+            a=authors, s=summary, u=pdf_url, l=url, p=published) or "pretty"
+        summary_chars: Truncate summaries to this many characters (0: full summary)
+
+    Returns:
+        JSON object mapping each paper ID to its information (null if not found)
+    """
+
+    paper_ids = list(dict.fromkeys(paper_ids))
+    papers = await run_read(store.get_papers, paper_ids)
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    for paper_id in paper_ids:
+        paper_info = papers.get(paper_id)
+        if paper_info is not None and fields:
+            paper_info = {field: paper_info[field] for field in fields if field in paper_info}
+        results[paper_id] = paper_info
+
+    return dump(results, output_format, summary_chars, layout=RECORD_MAP)
+
+
+def get_cache_stats() -> str:
+    """
+    Hit/miss counters of the arXiv query cache used by search_papers, and the
+    number of searches that joined an identical one already in flight.
+    """
+    stats = query_cache.stats()
+    stats["coalesced_searches"] = searches.coalesced
+    return json.dumps(stats, indent=2)
+
+
+def register_research_tools(mcp: FastMCP) -> None:
+    """Add the research tools and the stats://arxiv-cache resource to `mcp`."""
+    for tool in (
+        search_papers,
+        search_papers_batch,
+        refresh_topic,
+        search_local,
+        find_similar_papers,
+        extract_info,
+        get_papers,
+    ):
+        mcp.tool()(tool)
+    mcp.resource("stats://arxiv-cache")(get_cache_stats)
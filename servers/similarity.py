@@ -0,0 +1,222 @@
+"""
+"Find similar papers" backed by a sparse TF-IDF matrix of the stored papers.
+
+Raw term counts (title + summary) are kept in a SciPy CSR matrix, one row per
+paper. The L2-normalized TF-IDF matrix is derived from it with vectorized
+operations, and a similarity query is a single sparse matrix-vector product
+followed by a partial sort.
+
+New papers reach the index through the store's subscription hook and are
+appended as new rows (a paper found again keeps its row). The counts are
+persisted next to the store (papers/.tfidf.npz + papers/.tfidf.json) so that a
+restart only tokenizes the papers stored since the last save.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+
+from local_search import tokenize
+from paper_store import PaperStore
+
+
+# Minimum delay between two saves of the matrix to disk
+SAVE_INTERVAL = 60.0
+
+# New rows are weighted with the current IDF and appended to the TF-IDF matrix;
+# the whole matrix is re-weighted once they exceed this share of the corpus.
+REWEIGHT_RATIO = 0.01
+
+
+def weight_rows(counts: sp.csr_matrix, idf: np.ndarray) -> sp.csr_matrix:
+    """L2-normalized TF-IDF rows (sublinear tf) of a count matrix."""
+    tfidf = counts.astype(np.float32, copy=True)
+    tfidf.data = np.log1p(tfidf.data)
+    tfidf = tfidf @ sp.diags(idf)
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sp.csr_matrix(sp.diags(1 / norms) @ tfidf)
+
+
+class TfidfIndex:
+    def __init__(self, store: PaperStore, paper_dir: str):
+        self.store = store
+        self.matrix_path = os.path.join(paper_dir, ".tfidf.npz")
+        self.meta_path = os.path.join(paper_dir, ".tfidf.json")
+
+        self.vocabulary: Dict[str, int] = {}
+        self.paper_ids: List[str] = []
+        self.titles: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.counts = sp.csr_matrix((0, 0), dtype=np.float32)
+
+        self._pending: List[tuple] = []
+        self._tfidf: Optional[sp.csr_matrix] = None
+        self._idf: Optional[np.ndarray] = None
+        self._rows_since_reweight = 0
+        self._built = False
+        self._last_save = 0.0
+        self._lock = threading.RLock()
+        store.subscribe(self.on_papers_added)
+
+    # ---------- updates ----------
+
+    def _queue(self, paper_id: str, info: dict) -> None:
+        terms = Counter(tokenize(f"{info.get('title') or ''} {info.get('summary') or ''}"))
+        columns = [self.vocabulary.setdefault(term, len(self.vocabulary)) for term in terms]
+        self._pending.append((paper_id, info.get("title") or "", columns, list(terms.values())))
+
+    def on_papers_added(self, topic: str, papers: Dict[str, dict]) -> None:
+        with self._lock:
+            # Before the first build the store itself is the source of truth
+            if not self._built:
+                return
+            for paper_id, info in papers.items():
+                # A paper found again by a later search keeps its row
+                if paper_id not in self.row_of:
+                    self._queue(paper_id, info)
+                    self.row_of[paper_id] = -1
+
+    def _flush(self) -> None:
+        """Append the queued papers as new rows of the count matrix."""
+        if not self._pending:
+            return
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for _, _, columns, counts in self._pending:
+            indices.extend(columns)
+            data.extend(counts)
+            indptr.append(len(indices))
+        n_cols = len(self.vocabulary)
+        new_rows = sp.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(self._pending), n_cols),
+        )
+
+        counts = self.counts
+        counts.resize((counts.shape[0], n_cols))
+        self.counts = sp.vstack([counts, new_rows], format="csr")
+
+        self._rows_since_reweight += new_rows.shape[0]
+        if self._tfidf is not None and self._rows_since_reweight <= REWEIGHT_RATIO * self.counts.shape[0]:
+            # Few new papers: weight them with the current IDF (unseen terms get
+            # the IDF of a term found once) instead of re-weighting everything
+            idf = np.full(n_cols, np.log((1 + self.counts.shape[0]) / 2) + 1, dtype=np.float32)
+            idf[: len(self._idf)] = self._idf
+            self._idf = idf
+            tfidf = self._tfidf
+            tfidf.resize((tfidf.shape[0], n_cols))
+            self._tfidf = sp.vstack([tfidf, weight_rows(new_rows, idf)], format="csr")
+        else:
+            self._tfidf = None
+
+        for paper_id, title, _, _ in self._pending:
+            self.row_of[paper_id] = len(self.paper_ids)
+            self.paper_ids.append(paper_id)
+            self.titles.append(title)
+
+        self._pending = []
+        if time.time() - self._last_save > SAVE_INTERVAL:
+            self.save()
+
+    def _weighted(self) -> sp.csr_matrix:
+        """TF-IDF matrix, fully re-weighted only when too many rows were appended."""
+        if self._tfidf is None:
+            n_docs = self.counts.shape[0]
+            df = np.bincount(self.counts.indices, minlength=self.counts.shape[1])
+            self._idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+            self._tfidf = weight_rows(self.counts, self._idf)
+            self._rows_since_reweight = 0
+        return self._tfidf
+
+    # ---------- persistence ----------
+
+    def save(self) -> None:
+        with self._lock:
+            try:
+                sp.save_npz(self.matrix_path, self.counts)
+                tmp_path = self.meta_path + ".tmp"
+                with open(tmp_path, "w") as meta_file:
+                    json.dump(
+                        {
+                            "vocabulary": list(self.vocabulary),
+                            "paper_ids": self.paper_ids,
+                            "titles": self.titles,
+                        },
+                        meta_file,
+                    )
+                os.replace(tmp_path, self.meta_path)
+                self._last_save = time.time()
+            except OSError as e:
+                print(f"Error saving TF-IDF index: {str(e)}")
+
+    def _load(self) -> None:
+        try:
+            with open(self.meta_path, "r") as meta_file:
+                meta = json.load(meta_file)
+            counts = sp.load_npz(self.matrix_path).tocsr()
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Error loading TF-IDF index, rebuilding it: {str(e)}")
+            return
+        if counts.shape != (len(meta["paper_ids"]), len(meta["vocabulary"])):
+            return
+        self.counts = counts
+        self.vocabulary = {term: i for i, term in enumerate(meta["vocabulary"])}
+        self.paper_ids = meta["paper_ids"]
+        self.titles = meta["titles"]
+        self.row_of = {paper_id: row for row, paper_id in enumerate(self.paper_ids)}
+
+    def build(self) -> None:
+        """Load the saved matrix, then add the stored papers it does not know yet."""
+        with self._lock:
+            if self._built:
+                return
+            self._load()
+            for topic in self.store.list_topics():
+                try:
+                    for paper_id, info in self.store.iter_topic_papers(topic):
+                        # Same paper in several topics: tokenize it once
+                        if paper_id not in self.row_of:
+                            self._queue(paper_id, info)
+                            self.row_of[paper_id] = -1
+                except ValueError as e:
+                    print(f"Error indexing topic {topic}: {str(e)}")
+            self._flush()
+            self.save()
+            self._built = True
+
+    # ---------- queries ----------
+
+    def similar(self, paper_id: str, k: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the `k` stored papers closest to `paper_id` (cosine similarity),
+        or None if the paper is not stored.
+        """
+        self.build()
+        with self._lock:
+            self._flush()
+            row = self.row_of.get(paper_id)
+            if row is None or row < 0:
+                return None
+            tfidf = self._weighted()
+            scores = tfidf @ tfidf[row].toarray().ravel()
+            scores[row] = -1
+
+            k = min(k, len(scores) - 1)
+            if k <= 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [
+                {"paper_id": self.paper_ids[i], "title": self.titles[i], "score": round(float(scores[i]), 3)}
+                for i in best
+                if scores[i] > 0
+            ]
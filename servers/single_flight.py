@@ -0,0 +1,32 @@
+"""
+In-flight de-duplication ("single flight") for the async tools.
+
+When several clients ask for the same thing at the same time, only the first
+call does the work; the others await the same task and get the same result
+(or the same exception). Once the task is done the key is released, so the
+next call starts a fresh one.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+        # Calls that joined a task started by someone else
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: a caller giving up must not cancel the work the others await
+        return await asyncio.shield(task)
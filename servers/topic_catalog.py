@@ -0,0 +1,61 @@
+"""
+In-memory catalog of the stored topics, served by the papers://folders resource.
+
+The catalog ({topic: paper count, last update}) is loaded once from the store,
+then kept up to date by the store's write notifications: a written topic is
+marked dirty and only its count is re-read on the next access. Writes made by
+other processes are detected with the store's catalog_version (with SQLite, a
+counter of the writes this process did not make: a commit elsewhere triggers a
+reload of the small topics table) and, as a fallback, by a full reload every
+`ttl` seconds.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from paper_store import PaperStore
+
+
+class TopicCatalog:
+    def __init__(self, store: PaperStore, ttl: Optional[float] = None):
+        if ttl is None:
+            ttl = float(os.environ.get("PAPERS_CATALOG_TTL", "60"))
+        self.store = store
+        self.ttl = ttl
+        # topic -> (papers, updated_at)
+        self._topics: Dict[str, Tuple[int, float]] = {}
+        self._dirty: Set[str] = set()
+        self._version: Hashable = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        store.subscribe(self.on_papers_added)
+
+    def on_papers_added(self, topic: str, papers: Dict[str, dict]) -> None:
+        with self._lock:
+            self._dirty.add(topic)
+
+    def _reload(self) -> None:
+        self._topics = self.store.topic_stats()
+        self._dirty.clear()
+        self._loaded_at = time.monotonic()
+
+    def topics(self) -> List[Tuple[str, int, float]]:
+        """[(topic, papers, updated_at)] sorted by topic name."""
+        with self._lock:
+            version = self.store.catalog_version()
+            if (
+                self._loaded_at is None
+                or version != self._version
+                or time.monotonic() - self._loaded_at > self.ttl
+            ):
+                self._reload()
+            else:
+                now = time.time()
+                for topic in self._dirty:
+                    self._topics[topic] = (self.store.count_topic_papers(topic), now)
+                self._dirty.clear()
+            # Taken before reading the store: a write racing with the reload is seen next time
+            self._version = version
+            return sorted((topic, papers, updated_at) for topic, (papers, updated_at) in self._topics.items())
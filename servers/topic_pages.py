@@ -0,0 +1,119 @@
+"""
+Paged Markdown rendering of the papers://{topic} resources.
+
+A page only reads its own papers from the store (LIMIT/OFFSET with the sqlite
+backend) and is built as a list of parts joined once, so rendering time and
+memory are bounded by the page size, not by the size of the topic.
+
+Rendered pages are kept in an LRU cache. An entry is reused while the topic is
+unchanged: writes made through the store bump a per-topic counter (store
+subscription) and writes made by other processes change the store's
+topic_version (file mtimes, or membership / update timestamps).
+"""
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from paper_store import PaperStore, topic_key
+
+
+DEFAULT_PAGE_SIZE = int(os.environ.get("PAPERS_PAGE_SIZE", "20"))
+MAX_PAGE_SIZE = 100
+SUMMARY_CHARS = 500
+
+
+def page_uri(topic: str, page: int, size: int) -> str:
+    if size == DEFAULT_PAGE_SIZE:
+        return f"papers://{topic}/page/{page}"
+    return f"papers://{topic}/page/{page}/size/{size}"
+
+
+def render_topic_page(
+    topic: str, papers: Iterable[Tuple[str, dict]], total: int, page: int, size: int
+) -> str:
+    """Markdown for one page of a topic."""
+    pages = max(1, math.ceil(total / size))
+    parts = [
+        f"# Papers on {topic.replace('_', ' ').title()}\n\n",
+        f"Total papers: {total}\n\n",
+    ]
+    if 1 < pages and page <= pages:
+        parts.append(f"Page {page} of {pages} ({size} papers per page)\n\n")
+
+    rendered = 0
+    for paper_id, paper_info in papers:
+        # research_core.py stores the arXiv page as "url" instead of "pdf_url"
+        url = paper_info.get("pdf_url") or paper_info.get("url") or ""
+        parts.extend([
+            f"## {paper_info.get('title', '')}\n",
+            f"- **Paper ID**: {paper_id}\n",
+            f"- **Authors**: {', '.join(paper_info.get('authors') or [])}\n",
+            f"- **Published**: {paper_info.get('published')}\n",
+            f"- **PDF URL**: [{url}]({url})\n\n",
+            f"### Summary\n{(paper_info.get('summary') or '')[:SUMMARY_CHARS]}...\n\n",
+            "---\n\n",
+        ])
+        rendered += 1
+
+    if not rendered:
+        parts.append(f"No papers on page {page}: this topic has {pages} pages.\n")
+    elif page < pages:
+        parts.append(f"Next page: {page_uri(topic, page + 1, size)}\n")
+    return "".join(parts)
+
+
+class TopicPages:
+    def __init__(self, store: PaperStore, max_entries: Optional[int] = None):
+        if max_entries is None:
+            max_entries = int(os.environ.get("PAPERS_PAGE_CACHE_SIZE", "256"))
+        self.store = store
+        self.max_entries = max_entries
+        # (topic, page, size) -> (version, markdown)
+        self._pages: "OrderedDict[Tuple[str, int, int], Tuple[Hashable, str]]" = OrderedDict()
+        # Writes seen through the store, per topic
+        self._writes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        store.subscribe(self.on_papers_added)
+
+    def on_papers_added(self, topic: str, papers: Dict[str, dict]) -> None:
+        with self._lock:
+            self._writes[topic] = self._writes.get(topic, 0) + 1
+
+    def get(self, topic: str, page: int = 1, size: int = DEFAULT_PAGE_SIZE) -> Optional[str]:
+        """
+        Markdown of page `page` (1-based) of a topic, `size` papers per page,
+        or None if the topic holds no papers.
+        """
+        topic = topic_key(topic)
+        page = max(1, page)
+        size = min(max(1, size), MAX_PAGE_SIZE)
+        key = (topic, page, size)
+
+        with self._lock:
+            writes = self._writes.get(topic, 0)
+        version = (writes, self.store.topic_version(topic))
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] == version:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        total = self.store.count_topic_papers(topic)
+        if not total:
+            return None
+        papers = self.store.iter_topic_page(topic, (page - 1) * size, size)
+        content = render_topic_page(topic, papers, total, page, size)
+
+        with self._lock:
+            self._pages[key] = (version, content)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+        return content
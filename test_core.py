@@ -17,8 +17,8 @@ if __name__ == "__main__":
             print("Publié :", info.get("published"))
             print("URL    :", info.get("url"))
             print("Topic  :", info.get("topic"))
-            print("\nOK: JSON + TXT écrits dans papers/<topic>/")
+            print("\nOK: papier enregistré dans papers/papers.db")
         else:
-            print("Aucune info trouvée (JSON introuvable).")
+            print("Aucune info trouvée (papier absent du store).")
     else:
         print("Aucun ID retourné.")